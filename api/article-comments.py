@@ -1,13 +1,17 @@
 from http.server import BaseHTTPRequestHandler
 import json
 import os
-import jwt
-import urllib.request
 import urllib.parse
 import sys
-sys.path.append('/mnt/f/OneDrive - 株式会社羽生田鉄工所/Git/cfrp-monitor')
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.timezone_utils import now_jst_naive_iso
+from utils.supabase_rest import get_client
+from utils.jwt_auth import verify_bearer
+from utils.log import get_logger, log_requests
 
+log = get_logger("api.article-comments")
+
+@log_requests(log)
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         """記事のコメント一覧を取得"""
@@ -39,13 +43,19 @@ class handler(BaseHTTPRequestHandler):
                 self.wfile.write(json.dumps(response).encode('utf-8'))
                 return
             
-            # コメント一覧を取得
-            comments = self.get_article_comments(article_id)
+            # コメント一覧を取得（limit/offset でページ分割、since でそれ以降の差分だけ）
+            limit = query_params.get('limit', [None])[0]
+            offset = int(query_params.get('offset', ['0'])[0])
+            since = query_params.get('since', [None])[0]
+            comments = self.get_article_comments(article_id, int(limit) if limit else None, offset, since)
             
             response = {
                 "success": True,
-                "comments": comments
+                "comments": comments,
+                "latest": self.latest
             }
+            if limit:
+                response["has_more"] = self.has_more
             
             self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8'))
             
@@ -294,212 +304,109 @@ class handler(BaseHTTPRequestHandler):
         self.end_headers()
 
     def verify_token(self):
-        """JWTトークンの検証"""
-        try:
-            auth_header = self.headers.get('Authorization')
-            
-            if not auth_header or not auth_header.startswith('Bearer '):
-                return None
-            
-            token = auth_header.split(' ')[1]
-            secret = os.environ.get('JWT_SECRET', 'default-secret-key')
-            
-            # トークンをデコード
-            payload = jwt.decode(token, secret, algorithms=['HS256'])
-            return payload
-            
-        except jwt.ExpiredSignatureError:
-            return None
-        except jwt.InvalidTokenError:
-            return None
-        except Exception:
-            return None
+        """JWTトークンの検証（検証済みトークンは utils/jwt_auth.py でキャッシュ）"""
+        return verify_bearer(self.headers.get('Authorization'))
 
-    def get_article_comments(self, article_id):
-        """記事のコメント一覧を取得"""
+    def get_article_comments(self, article_id, limit=None, offset=0, since=None):
+        """
+        記事のコメント一覧を取得
+        投稿者の表示名は article_comments_with_author ビュー（sql/004_article_comments_with_author.sql）で
+        結合済みなので 1 回の問い合わせで返る。
+        since（前回レスポンスの latest）を渡すと、それ以降に作成・編集・削除されたコメントだけを返す。
+        削除を反映できるよう、この場合は is_deleted=true の行も含める。
+        since と limit を併用して has_more が true の間は latest を進めないので、
+        クライアントは同じ since のまま offset を進めて続きを取得する。
+        """
+        self.latest = since
+        self.has_more = False
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return []
-            
-            # コメント一覧を取得（削除されていないもののみ、作成日時順）
-            # JOINは300エラーになるため、まずはJOINなしで取得
-            url = f'{supabase_url}/rest/v1/article_comments?select=*&article_id=eq.{article_id}&is_deleted=eq.false&order=created_at.asc'
-            
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req) as response:
-                comments = json.loads(response.read().decode('utf-8'))
-                
-                # ユーザーIDのリストを作成
-                user_ids = list(set([comment['user_id'] for comment in comments if comment.get('user_id')]))
-                
-                if user_ids:
-                    # ユーザー情報を一括取得
-                    user_ids_str = ','.join(user_ids)
-                    users_url = f'{supabase_url}/rest/v1/users?select=user_id,display_name&user_id=in.({user_ids_str})'
-                    
-                    try:
-                        users_req = urllib.request.Request(users_url, headers=headers)
-                        with urllib.request.urlopen(users_req) as users_response:
-                            users_data = json.loads(users_response.read().decode('utf-8'))
-                            
-                            # ユーザーIDをキーとした辞書を作成
-                            users_dict = {user['user_id']: user for user in users_data}
-                            
-                            # コメントにユーザー情報を追加
-                            for comment in comments:
-                                user_id = comment.get('user_id')
-                                if user_id and user_id in users_dict:
-                                    comment['users'] = {'display_name': users_dict[user_id].get('display_name')}
-                    except Exception as e:
-                        print(f"Failed to fetch user info: {e}")
-                        # ユーザー情報取得に失敗してもコメントは返す
-                
-                return comments
+            query = get_client().table('article_comments_with_author').select('*').eq('article_id', article_id)
+            if since:
+                # 差分は更新日時順（最後のページの最大値がそのまま全体の最新になる）
+                query.gt('updated_at', since).order('updated_at').order('id')
+            else:
+                # 削除されていないもののみ、作成日時順
+                query.eq('is_deleted', False).order('created_at').order('id')
+            
+            # 次ページの有無を知るため 1 件多く取得する
+            if limit:
+                query.limit(limit + 1).offset(offset)
+            
+            comments = query.execute().data or []
+            if limit and len(comments) > limit:
+                comments = comments[:limit]
+                self.has_more = True
+            
+            if limit and not since:
+                # 作成日時順のページ内の最大値は記事全体の最新とは限らないので別に問い合わせる
+                self.latest = self.get_latest_updated_at(article_id)
+            elif not self.has_more:
+                updated = [c['updated_at'] for c in comments if c.get('updated_at')]
+                if updated:
+                    self.latest = max(updated + ([since] if since else []))
+            
+            return comments
         
         except Exception as e:
-            print(f"Get comments error: {str(e)}")
+            log.error("Get comments error", error=str(e))
             return []
 
+    def get_latest_updated_at(self, article_id):
+        """記事のコメント（削除済みを含む）の最新の updated_at。(article_id, updated_at) のインデックスで引く"""
+        rows = (get_client().table('article_comments').select('updated_at')
+                .eq('article_id', article_id).order('updated_at', desc=True).limit(1).execute().data)
+        return rows[0]['updated_at'] if rows else None
+
     def get_comment_by_id(self, comment_id):
         """コメントIDでコメントを取得"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
-            url = f"{supabase_url}/rest/v1/article_comments?id=eq.{comment_id}&limit=1"
-            
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req) as response:
-                data = json.loads(response.read().decode('utf-8'))
-                return data[0] if data else None
+            data = get_client().table('article_comments').select('*').eq('id', comment_id).limit(1).execute().data
+            return data[0] if data else None
         
         except Exception as e:
-            print(f"Get comment by ID error: {str(e)}")
+            log.error("Get comment by ID error", error=str(e))
             return None
     
     def create_comment(self, comment_data):
         """コメントを作成"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
-            url = f"{supabase_url}/rest/v1/article_comments"
-            
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json',
-                'Prefer': 'return=representation'
-            }
-            
             # parent_comment_idがNullの場合は除外
             if comment_data['parent_comment_id'] is None:
                 del comment_data['parent_comment_id']
             
-            post_data = json.dumps(comment_data).encode('utf-8')
-            
-            req = urllib.request.Request(url, data=post_data, headers=headers, method='POST')
-            with urllib.request.urlopen(req) as response:
-                result = json.loads(response.read().decode('utf-8'))
-                return result[0] if result else None
+            result = get_client().table('article_comments').insert(comment_data).execute().data
+            return result[0] if result else None
         
         except Exception as e:
-            print(f"Create comment error: {str(e)}")
+            log.error("Create comment error", error=str(e))
             return None
     
     def update_comment(self, comment_id, new_comment):
         """コメントを更新"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
-            url = f"{supabase_url}/rest/v1/article_comments?id=eq.{comment_id}"
-            
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json',
-                'Prefer': 'return=representation'
-            }
-            
             update_data = {
                 'comment': new_comment,
                 'updated_at': now_jst_naive_iso()
             }
             
-            req = urllib.request.Request(
-                url, 
-                data=json.dumps(update_data).encode('utf-8'),
-                headers=headers,
-                method='PATCH'
-            )
-            
-            with urllib.request.urlopen(req) as response:
-                result = json.loads(response.read().decode('utf-8'))
-                return result[0] if result else None
+            result = get_client().table('article_comments').update(update_data).eq('id', comment_id).execute().data
+            return result[0] if result else None
         
         except Exception as e:
-            print(f"Update comment error: {str(e)}")
+            log.error("Update comment error", error=str(e))
             return None
     
     def delete_comment(self, comment_id):
         """コメントを削除（論理削除）"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
-            url = f"{supabase_url}/rest/v1/article_comments?id=eq.{comment_id}"
-            
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json',
-                'Prefer': 'return=representation'
-            }
-            
             update_data = {
                 'is_deleted': True,
                 'updated_at': now_jst_naive_iso()
             }
             
-            req = urllib.request.Request(
-                url, 
-                data=json.dumps(update_data).encode('utf-8'),
-                headers=headers,
-                method='PATCH'
-            )
-            
-            with urllib.request.urlopen(req) as response:
-                result = json.loads(response.read().decode('utf-8'))
-                return result[0] if result else None
+            result = get_client().table('article_comments').update(update_data).eq('id', comment_id).execute().data
+            return result[0] if result else None
         
         except Exception as e:
-            print(f"Delete comment error: {str(e)}")
+            log.error("Delete comment error", error=str(e))
             return None
\ No newline at end of file
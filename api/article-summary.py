@@ -3,21 +3,28 @@ import json
 import os
 import urllib.request
 import urllib.parse
-import jwt
 import sys
 import importlib.util
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.extraction_cache import ExtractionCache, hash_html
+from utils.supabase_rest import get_client, SupabaseError
+from utils.jwt_auth import verify_bearer
+from utils.log import get_logger, log_requests, timed
+
+log = get_logger("api.article-summary")
+
+# クローラーが抽出した本文は articles.body に入っているので、まずそれを使う（stored_article_body）。
+# 本文が無い記事だけページを取得して抽出し、その結果はウォーム起動の間この /tmp のキャッシュで使い回す
+extraction_cache = ExtractionCache()
+# 本文として使う最低文字数（fetch_article_content の抽出結果と同じ基準）
+MIN_CONTENT_CHARS = 500
+# 抽出ロジック（下の正規表現 + AI 候補選択）を変えたら末尾を上げる
+SUMMARY_EXTRACTOR_ID = "summary_regex/1"
 
 # ArticlesHandlerを直接定義（インポート問題を回避）
 def update_ai_summary_direct(article_id, ai_summary, user_data):
     """記事のAI要約を直接データベースに保存"""
     try:
-        supabase_url = os.environ.get('SUPABASE_URL')
-        supabase_key = os.environ.get('SUPABASE_KEY')
-        
-        if not supabase_url or not supabase_key:
-            print("Supabase credentials not found")
-            return None
-        
         # 現在時刻（JST）を取得
         from datetime import datetime, timezone, timedelta
         jst = timezone(timedelta(hours=9))
@@ -31,39 +38,18 @@ def update_ai_summary_direct(article_id, ai_summary, user_data):
         }
         
         # データベースを更新
-        url = f"{supabase_url}/rest/v1/articles?id=eq.{article_id}"
-        headers = {
-            'apikey': supabase_key,
-            'Authorization': f'Bearer {supabase_key}',
-            'Content-Type': 'application/json',
-            'Prefer': 'return=representation'
-        }
-        
-        data = json.dumps(update_data).encode('utf-8')
-        
-        req = urllib.request.Request(
-            url,
-            data=data,
-            headers=headers,
-            method='PATCH'
-        )
-        
-        with urllib.request.urlopen(req) as response:
-            result = json.loads(response.read().decode('utf-8'))
-            print(f"AI summary saved for article {article_id}")
-            return result[0] if isinstance(result, list) and result else result
+        result = get_client().table('articles').update(update_data).eq('id', article_id).execute().data
+        log.info("ai summary saved", article_id=article_id)
+        return result[0] if isinstance(result, list) and result else result
                 
-    except urllib.error.HTTPError as e:
-        print(f"Update AI summary HTTP error: {e.code} - {e.reason}")
-        error_body = e.read().decode('utf-8')
-        print(f"Error body: {error_body}")
+    except SupabaseError as e:
+        log.error("Update AI summary HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
         return None
     except Exception as e:
-        print(f"Update AI summary error: {e}")
+        log.error("Update AI summary error", error=str(e))
         return None
 
-print("Direct AI summary update function ready")
-
+@log_requests(log)
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
         self.send_response(200)
@@ -79,12 +65,8 @@ class handler(BaseHTTPRequestHandler):
                 self.wfile.write(json.dumps(response).encode('utf-8'))
                 return
             
-            token = auth_header.split(' ')[1]
-            try:
-                jwt_secret = os.environ.get('JWT_SECRET', 'default-secret-key')
-                decoded = jwt.decode(token, jwt_secret, algorithms=['HS256'])
-                user_data = decoded  # ユーザー情報を保持
-            except jwt.InvalidTokenError:
+            user_data = verify_bearer(auth_header)  # ユーザー情報を保持
+            if not user_data:
                 response = {"success": False, "error": "無効なトークンです"}
                 self.wfile.write(json.dumps(response).encode('utf-8'))
                 return
@@ -107,25 +89,21 @@ class handler(BaseHTTPRequestHandler):
                 self.wfile.write(json.dumps(response).encode('utf-8'))
                 return
             
-            # URLから記事内容を取得
-            print(f"Attempting to fetch content from URL: {article_url}")
-            article_content = self.fetch_article_content(article_url)
+            # クローラーが保存した本文を優先し、無ければURLから記事内容を取得
+            article_content = self.stored_article_body(article_id) or self.fetch_article_content(article_url)
             
             if not article_content:
-                print(f"Failed to fetch article content from URL: {article_url}")
+                log.warning("article content not available", url=article_url)
                 response = {"success": False, "error": "記事の内容を取得できませんでした"}
                 self.wfile.write(json.dumps(response).encode('utf-8'))
                 return
             
-            print(f"Successfully fetched article content: {len(article_content)} characters")
-            
             # 記事本文の長さチェック（長すぎる場合は先頭部分のみ使用）
             max_length = 8000  # Gemini APIの制限を考慮
             if len(article_content) > max_length:
                 article_content = article_content[:max_length] + "..."
             
             # Google Gemini APIで要約生成
-            print(f"Generating summary for {len(article_content)} characters of content")
             summary = self.generate_summary(article_content)
             
             if summary == "OVERLOADED":
@@ -137,7 +115,7 @@ class handler(BaseHTTPRequestHandler):
                 self.wfile.write(json.dumps(response).encode('utf-8'))
                 return
             elif summary:
-                print(f"Summary generated successfully: {len(summary)} characters")
+                log.info("summary generated", article_id=article_id, content_chars=len(article_content), summary_chars=len(summary))
                 # 要約をデータベースに保存
                 try:
                     save_result = update_ai_summary_direct(article_id, summary, user_data)
@@ -165,7 +143,7 @@ class handler(BaseHTTPRequestHandler):
                             }
                         }
                 except Exception as save_error:
-                    print(f"Save error: {save_error}")
+                    log.error("Save error", error=str(save_error))
                     response = {
                         "success": True,
                         "summary": summary,
@@ -176,7 +154,7 @@ class handler(BaseHTTPRequestHandler):
                         }
                     }
             else:
-                print("Summary generation failed - returned None or empty")
+                log.warning("summary generation failed", article_id=article_id)
                 response = {
                     "success": False,
                     "error": "要約の生成に失敗しました"
@@ -197,11 +175,39 @@ class handler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
         self.end_headers()
     
+    def stored_article_body(self, article_id):
+        """クローラーが保存した本文（articles.body）をテキスト化して返す。短すぎる・無い場合は None"""
+        try:
+            rows = get_client().table('articles').select('body').eq('id', article_id).limit(1).execute().data
+        except SupabaseError as e:
+            log.warning("stored body lookup failed", article_id=article_id, status=e.status)
+            return None
+        except Exception as e:
+            # 通信エラーや SUPABASE_URL 未設定でも要約自体は止めず、ページ取得にフォールバックする
+            log.warning("stored body lookup failed", article_id=article_id, error=str(e))
+            return None
+        body = rows[0].get('body') if rows else None
+        if not body:
+            return None
+        # フィード由来の本文は HTML のことがある
+        import re
+        import html
+        text = re.sub(r'<(script|style)[^>]*>.*?</\1>', '', body, flags=re.DOTALL | re.IGNORECASE)
+        text = html.unescape(re.sub(r'<[^>]+>', ' ', text))
+        text = re.sub(r'\s+', ' ', text).strip()
+        if len(text) < MIN_CONTENT_CHARS:
+            return None
+        log.info("using stored article body", article_id=article_id, chars=len(text))
+        return text
+    
     def fetch_article_content(self, url):
         """URLから記事内容を取得"""
+        cached = extraction_cache.get(url, SUMMARY_EXTRACTOR_ID)
+        if cached:
+            log.debug("extraction cache hit", url=url)
+            return cached
+        
         try:
-            print(f"Fetching content from URL: {url}")
-            
             # User-Agentを設定してWebページを取得
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -210,7 +216,17 @@ class handler(BaseHTTPRequestHandler):
             req = urllib.request.Request(url, headers=headers)
             
             with urllib.request.urlopen(req, timeout=10) as response:
-                html_content = response.read().decode('utf-8')
+                raw_html = response.read()
+                html_sha256 = hash_html(raw_html)
+                
+                # 同じ HTML を抽出済みならダウンロード後の解析を省略
+                cached = extraction_cache.get_by_hash(html_sha256, SUMMARY_EXTRACTOR_ID)
+                if cached:
+                    log.debug("extraction cache hit (same HTML)", url=url)
+                    extraction_cache.put(url, html_sha256, cached, SUMMARY_EXTRACTOR_ID)
+                    return cached
+                
+                html_content = raw_html.decode('utf-8')
                 
                 # 構造化されたHTMLパースで記事内容を抽出
                 import re
@@ -239,7 +255,7 @@ class handler(BaseHTTPRequestHandler):
                         text_candidate = html.unescape(text_candidate)
                         text_candidate = re.sub(r'\s+', ' ', text_candidate).strip()
                         
-                        print(f"Candidate found with selector {selector}: {len(text_candidate)} chars")
+                        log.debug("candidate found", selector=selector, chars=len(text_candidate))
                         if len(text_candidate) > 200:  # 最低限の長さチェック
                             candidates.append({
                                 'text': text_candidate[:1000],  # 最初の1000文字のみAI判定用
@@ -247,8 +263,6 @@ class handler(BaseHTTPRequestHandler):
                                 'selector': selector
                             })
                 
-                print(f"Total candidates found: {len(candidates)}")
-                
                 article_html = None
                 used_selector = None
                 
@@ -258,15 +272,12 @@ class handler(BaseHTTPRequestHandler):
                     if best_candidate:
                         text_content = best_candidate['full_content']
                         used_selector = f"ai_selected_{best_candidate['selector']}"
-                        print(f"AI selected content using: {used_selector}")
                     else:
                         # AI判定に失敗した場合は最長の候補を使用
                         best_candidate = max(candidates, key=lambda x: len(x['full_content']))
                         text_content = best_candidate['full_content']
                         used_selector = f"fallback_{best_candidate['selector']}"
-                        print(f"AI selection failed, using longest candidate: {used_selector}")
                 else:
-                    print("No content candidates found, using full HTML")
                     text_content = re.sub(r'<[^>]+>', '', html_content)
                     text_content = html.unescape(text_content)
                     text_content = re.sub(r'\s+', ' ', text_content).strip()
@@ -279,7 +290,6 @@ class handler(BaseHTTPRequestHandler):
                     paragraphs = re.findall(paragraph_pattern, text_content, flags=re.DOTALL | re.IGNORECASE)
                     
                     if paragraphs and len(paragraphs) > 1:  # 複数のp要素がある場合のみ
-                        print(f"Found {len(paragraphs)} paragraph elements, refining extraction")
                         cleaned_paragraphs = []
                         for p in paragraphs:
                             clean_p = re.sub(r'<[^>]+>', '', p)
@@ -293,37 +303,26 @@ class handler(BaseHTTPRequestHandler):
                             used_selector += "_with_paragraphs"
                 
                 # 記事らしい部分を抽出（最低500文字以上あることを確認）
-                if len(text_content) < 500:
-                    print(f"Content too short: {len(text_content)} characters")
+                if len(text_content) < MIN_CONTENT_CHARS:
+                    log.info("content too short", url=url, chars=len(text_content))
                     return None
                 
-                print(f"Successfully extracted {len(text_content)} characters using {used_selector}")
-                
-                # デバッグ用：最初の500文字を表示
-                print(f"Content preview: {text_content[:500]}...")
-                
-                # デバッグ用：抽出した全文をログ出力（長い場合は分割）
-                print("=== EXTRACTED ARTICLE CONTENT START ===")
-                print(f"Extraction method: {used_selector}")
-                if len(text_content) > 2000:
-                    # 長い場合は最初と最後を表示
-                    print(f"First 1000 chars: {text_content[:1000]}")
-                    print("...")
-                    print(f"Last 1000 chars: {text_content[-1000:]}")
-                else:
-                    print(text_content)
-                print("=== EXTRACTED ARTICLE CONTENT END ===")
+                # 本文そのものは出さない（LOG_LEVEL=DEBUG のときだけ先頭を出す）
+                log.info("article content extracted", url=url, chars=len(text_content),
+                         method=used_selector, candidates=len(candidates))
+                log.debug("article content preview", url=url, preview=text_content[:500])
                 
+                extraction_cache.put(url, html_sha256, text_content, SUMMARY_EXTRACTOR_ID)
                 return text_content
                 
         except urllib.error.HTTPError as e:
-            print(f"HTTP error fetching {url}: {e.code}")
+            log.warning("HTTP error fetching article", url=url, status=e.code)
             return None
         except urllib.error.URLError as e:
-            print(f"URL error fetching {url}: {e}")
+            log.warning("URL error fetching article", url=url, error=str(e))
             return None
         except Exception as e:
-            print(f"Error fetching article content: {e}")
+            log.error("Error fetching article content", url=url, error=str(e))
             return None
     
     def select_best_content_with_ai(self, candidates):
@@ -365,7 +364,7 @@ class handler(BaseHTTPRequestHandler):
                     try:
                         selected_index = int(response_text) - 1
                         if 0 <= selected_index < len(candidates):
-                            print(f"AI selected candidate {selected_index + 1}")
+                            log.debug("ai selected candidate", index=selected_index + 1)
                             return candidates[selected_index]
                     except ValueError:
                         pass
@@ -373,16 +372,15 @@ class handler(BaseHTTPRequestHandler):
             return None
                         
         except Exception as e:
-            print(f"AI content selection error: {e}")
+            log.error("AI content selection error", error=str(e))
             return None
     
     def generate_summary(self, article_text):
         """Google Gemini APIを使用して記事を要約"""
-        print(f"generate_summary called with {len(article_text)} characters")
         try:
             gemini_api_key = os.environ.get('GEMINI_API_KEY')
             if not gemini_api_key:
-                print("GEMINI_API_KEY環境変数が設定されていません")
+                log.error("GEMINI_API_KEY環境変数が設定されていません")
                 return None
             
             # Gemini API endpoint
@@ -447,12 +445,11 @@ output_format: "要約のみをプレーンテキストで出力してくださ
             req_data = json.dumps(request_data).encode('utf-8')
             req = urllib.request.Request(url, data=req_data, headers=headers)
             
-            print(f"Calling Gemini API with {len(req_data)} bytes of data")
-            with urllib.request.urlopen(req, timeout=30) as response:
+            with timed(log, "gemini summary request", request_bytes=len(req_data)) as call, \
+                 urllib.request.urlopen(req, timeout=30) as response:
                 response_data = response.read().decode('utf-8')
-                print(f"Gemini API response received: {len(response_data)} bytes")
+                call["response_bytes"] = len(response_data)
                 result = json.loads(response_data)
-                print(f"Gemini API response parsed successfully")
                 
                 # レスポンスから要約テキストを抽出
                 if 'candidates' in result and len(result['candidates']) > 0:
@@ -468,40 +465,23 @@ output_format: "要約のみをプレーンテキストで出力してくださ
                             
                             return summary_text
                 
-                print(f"Unexpected API response: {result}")
+                log.warning("unexpected Gemini API response", response=json.dumps(result, ensure_ascii=False)[:500])
                 return None
                 
         except urllib.error.HTTPError as e:
             error_body = e.read().decode('utf-8')
-            print(f"Gemini API HTTPError: {e.code} - {error_body}")
+            log.error("Gemini API HTTPError", status=e.code, body=error_body[:500])
             
-            # エラー内容を詳細に表示し、ユーザーフレンドリーなメッセージを作成
-            try:
-                error_json = json.loads(error_body)
-                print(f"Gemini API Error Details: {json.dumps(error_json, indent=2)}")
-                
-                # 503エラー（サービス過負荷）の場合は分かりやすいメッセージにする
-                if e.code == 503:
-                    print("Gemini API is temporarily overloaded")
-                    return "OVERLOADED"  # 特別な値を返してフロントエンドで処理
-                
-            except:
-                print(f"Raw error body: {error_body}")
+            # 503エラー（サービス過負荷）の場合は分かりやすいメッセージにする
+            if e.code == 503:
+                return "OVERLOADED"  # 特別な値を返してフロントエンドで処理
             return None
         except urllib.error.URLError as e:
-            print(f"Gemini API URLError: {e}")
-            print(f"URLError reason: {e.reason}")
+            log.error("Gemini API URLError", reason=str(e.reason))
             return None
         except json.JSONDecodeError as e:
-            print(f"JSON decode error: {e}")
-            try:
-                print(f"Response data that failed to parse: {response_data[:500]}...")
-            except:
-                print("Response data not available for display")
+            log.error("Gemini API JSON decode error", error=str(e))
             return None
         except Exception as e:
-            print(f"Gemini API Error: {e}")
-            print(f"Error type: {type(e).__name__}")
-            import traceback
-            print(f"Traceback: {traceback.format_exc()}")
+            log.error("Gemini API Error", error=str(e), error_type=type(e).__name__, exc_info=True)
             return None
\ No newline at end of file
@@ -1,14 +1,57 @@
 from http.server import BaseHTTPRequestHandler
 import json
 import os
-import urllib.request
 import urllib.parse
-import jwt
 import datetime
+import base64
+import re
+import time
+import threading
 import sys
-sys.path.append('/mnt/f/OneDrive - 株式会社羽生田鉄工所/Git/cfrp-monitor')
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.timezone_utils import now_jst_naive_iso, today_jst_iso
+from utils.supabase_rest import get_client, SupabaseError, _quoted
+from utils.jwt_auth import verify_bearer
+from utils.log import get_logger, log_requests
 
+log = get_logger("api.articles")
+
+# 一覧表示（view=list）で返す列。本文（body）と AI 要約（ai_summary）は返さず、
+# 要約の有無は has_ai_summary（sql/003_article_has_ai_summary.sql）で判定する。
+# 本文が必要なときは単一記事取得（?id=）で読む
+LIST_FIELDS = ['id', 'title', 'url', 'status', 'flagged', 'comments', 'published_at', 'added_at',
+               'source_id', 'comment_count', 'has_ai_summary', 'sources']
+# カーソル（next_cursor）の組み立てに必要なので常に含める列
+REQUIRED_FIELDS = ['id', 'added_at']
+FIELD_NAME = re.compile(r'^[a-z_][a-z0-9_]*$')
+
+# ── 件数キャッシュ ─────────────────────────────────────
+# count_only の結果をフィルタの組み合わせ・count モードごとに短時間保持する。
+# モジュール変数なのでウォームなインスタンス内の後続リクエストで共有され、
+# このインスタンスでの記事の追加・更新・削除で破棄する（他経路の書き込みは TTL で反映）。
+COUNT_CACHE_TTL = float(os.environ.get('ARTICLES_COUNT_CACHE_TTL', '60'))
+# exact: 正確（全件走査）/ planned: プランナの推定値 / estimated: 少なければ exact、多ければ planned
+COUNT_MODES = ('exact', 'planned', 'estimated')
+_count_cache = {}  # (フィルタ, モード) -> (保存時刻, 件数)
+_count_cache_lock = threading.Lock()
+
+def get_cached_count(key):
+    with _count_cache_lock:
+        hit = _count_cache.get(key)
+        if hit and time.monotonic() - hit[0] < COUNT_CACHE_TTL:
+            return hit[1]
+        _count_cache.pop(key, None)
+        return None
+
+def store_count(key, count):
+    with _count_cache_lock:
+        _count_cache[key] = (time.monotonic(), count)
+
+def invalidate_counts():
+    with _count_cache_lock:
+        _count_cache.clear()
+
+@log_requests(log)
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         self.send_response(200)
@@ -41,13 +84,16 @@ class handler(BaseHTTPRequestHandler):
                 return
             
             # 記事一覧を取得
+            self.next_cursor = None
             articles = self.get_articles(query_params)
             
             if articles is not None:
                 response = {
                     "success": True,
                     "articles": articles,
-                    "count": len(articles)
+                    "count": len(articles),
+                    # 次ページの after に渡すカーソル（最終ページなら None）
+                    "next_cursor": self.next_cursor
                 }
             else:
                 response = {
@@ -84,10 +130,7 @@ class handler(BaseHTTPRequestHandler):
             # リクエストボディを取得
             content_length = int(self.headers['Content-Length'])
             post_data = self.rfile.read(content_length)
-            print(f"DEBUG: Raw POST data: {post_data}")
-            
             data = json.loads(post_data.decode('utf-8'))
-            print(f"DEBUG: Parsed JSON data: {data}")
             
             # 記事追加
             result = self.add_article(data, user_data)
@@ -231,45 +274,77 @@ class handler(BaseHTTPRequestHandler):
         self.end_headers()
 
     def verify_token(self):
-        """JWTトークンの検証"""
+        """JWTトークンの検証（検証済みトークンは utils/jwt_auth.py でキャッシュ）"""
+        return verify_bearer(self.headers.get('Authorization'))
+
+    def build_filters(self, query_params):
+        """一覧・件数取得で共通のフィルタを (列, 演算子, 値) のリストで返す"""
+        status = query_params.get('status', [None])[0]
+        flagged = query_params.get('flagged', [None])[0]
+        source_id = query_params.get('source_id', [None])[0]
+        has_comments = query_params.get('has_comments', [None])[0]
+        
+        filters = []
+        if status:
+            filters.append(('status', 'eq', status))
+        if flagged is not None:
+            filters.append(('flagged', 'eq', flagged.lower() == 'true'))
+        if source_id:
+            filters.append(('source_id', 'eq', source_id))
+        # コメント数は articles.comment_count（トリガで維持, sql/001_article_comment_count.sql）で絞り込む
+        if has_comments == 'with_comments':
+            filters.append(('comment_count', 'gt', 0))
+        elif has_comments == 'no_comments':
+            filters.append(('comment_count', 'eq', 0))
+        return filters
+
+    def build_select(self, query_params):
+        """
+        一覧の select 句を組み立てる。
+        fields=a,b,c なら指定列だけ、view=list なら LIST_FIELDS、どちらも無ければ従来どおり全列。
+        sources を指定するとソース名・ドメインを埋め込む。
+        """
+        fields = query_params.get('fields', [None])[0]
+        view = query_params.get('view', [None])[0]
+        
+        if fields:
+            names = [f.strip() for f in fields.split(',') if f.strip()]
+        elif view == 'list':
+            names = list(LIST_FIELDS)
+        else:
+            return "*,sources(name,domain)"
+        
+        for name in names:
+            if not FIELD_NAME.match(name):
+                raise ValueError(f"invalid field: {name}")
+        names = REQUIRED_FIELDS + [n for n in dict.fromkeys(names) if n not in REQUIRED_FIELDS]
+        return ",".join("sources(name,domain)" if n == 'sources' else n for n in names)
+
+    @staticmethod
+    def encode_cursor(article):
+        """(added_at, id) を不透明なカーソル文字列にする"""
+        raw = json.dumps([article['added_at'], article['id']], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode_cursor(token):
+        """カーソル文字列を (added_at, id) に戻す。不正なら ValueError"""
         try:
-            auth_header = self.headers.get('Authorization')
-            print(f"DEBUG: Authorization header: {auth_header}")
-            
-            if not auth_header or not auth_header.startswith('Bearer '):
-                print("DEBUG: No valid Authorization header")
-                return None
-            
-            token = auth_header.split(' ')[1]
-            print(f"DEBUG: Token: {token[:20]}...")
-            
-            secret = os.environ.get('JWT_SECRET', 'default-secret-key')
-            print(f"DEBUG: JWT Secret exists: {bool(secret)}")
-            
-            # トークンをデコード
-            payload = jwt.decode(token, secret, algorithms=['HS256'])
-            print(f"DEBUG: Token payload: {payload}")
-            return payload
-            
-        except jwt.ExpiredSignatureError:
-            print("DEBUG: Token expired")
-            return None
-        except jwt.InvalidTokenError as e:
-            print(f"DEBUG: Invalid token: {e}")
-            return None
-        except Exception as e:
-            print(f"Token verification error: {e}")
-            return None
+            padded = token + '=' * (-len(token) % 4)
+            added_at, article_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        except Exception:
+            raise ValueError(f"invalid cursor: {token}")
+        if not isinstance(added_at, str) or not isinstance(article_id, (str, int)):
+            raise ValueError(f"invalid cursor: {token}")
+        return added_at, article_id
 
     def get_articles(self, query_params=None):
-        """記事一覧を取得（フィルタリング、ページネーション対応）"""
+        """
+        記事一覧を取得（フィルタリング、ページネーション対応）
+        after（前ページの next_cursor）を渡すと (added_at, id) のキーセットで続きを取得する。
+        offset と違い深いページでも一定コストで、クロールによる行の追加でずれない。
+        """
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
             if query_params is None:
                 query_params = {}
             
@@ -277,284 +352,102 @@ class handler(BaseHTTPRequestHandler):
             article_id = query_params.get('id', [None])[0]
             limit = int(query_params.get('limit', ['20'])[0])
             offset = int(query_params.get('offset', ['0'])[0])
-            order = query_params.get('order', ['desc'])[0]
-            status = query_params.get('status', [None])[0]
-            flagged = query_params.get('flagged', [None])[0]
-            source_id = query_params.get('source_id', [None])[0]
-            has_comments = query_params.get('has_comments', [None])[0]
+            after = query_params.get('after', [None])[0]
             
             # 単一記事取得の場合
             if article_id:
                 return self.get_single_article(article_id)
             
-            # コメントフィルタリングがある場合は、コメント数も含めて取得
-            if has_comments:
-                # すべての記事を取得してコメント数を計算し、フィルタリング後にページネーション適用
-                temp_url = f"{supabase_url}/rest/v1/articles?select=*,sources(name,domain)"
-                
-                # 基本フィルターを適用
-                filters = []
-                if status:
-                    filters.append(f"status=eq.{status}")
-                if flagged is not None:
-                    flag_value = 'true' if flagged.lower() == 'true' else 'false'
-                    filters.append(f"flagged=eq.{flag_value}")
-                if source_id:
-                    filters.append(f"source_id=eq.{source_id}")
-                
-                if filters:
-                    temp_url += "&" + "&".join(filters)
-                
-                # ソート順を適用（記事登録日の降順固定）
-                temp_url += f"&order=added_at.desc"
-                
-                url = temp_url
+            # フィルタ（has_comments を含む）とページネーションはすべて DB 側で行う
+            query = get_client().table('articles').select(self.build_select(query_params))
+            for column, operator, value in self.build_filters(query_params):
+                query.filter(column, operator, value)
+            
+            # ソートとページネーションを追加（記事登録日の降順固定、同時刻は id で順序を確定）
+            # 次ページの有無を知るため 1 件多く取得する
+            query.order('added_at', desc=True).order('id', desc=True).limit(limit + 1)
+            if after:
+                added_at, last_id = self.decode_cursor(after)
+                # 単純な範囲条件も付けて、インデックスの走査をカーソル位置から始めさせる
+                # （or= だけだとプランナが範囲に使えない）。カーソルはクライアント由来なので値はクォートする
+                query.lte('added_at', added_at)
+                query.or_(f'added_at.lt.{_quoted(added_at)},'
+                          f'and(added_at.eq.{_quoted(added_at)},id.lt.{_quoted(last_id)})')
             else:
-                # 通常のページネーション処理
-                url = f"{supabase_url}/rest/v1/articles?select=*,sources(name,domain)"
-                
-                # フィルタリングを追加
-                filters = []
-                if status:
-                    filters.append(f"status=eq.{status}")
-                if flagged is not None:
-                    flag_value = 'true' if flagged.lower() == 'true' else 'false'
-                    filters.append(f"flagged=eq.{flag_value}")
-                if source_id:
-                    filters.append(f"source_id=eq.{source_id}")
-                
-                if filters:
-                    url += "&" + "&".join(filters)
-                
-                # ソートとページネーションを追加（記事登録日の降順固定）
-                url += f"&order=added_at.desc&limit={limit}&offset={offset}"
-            
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            print(f"DEBUG: Supabase URL: {url}")
-            
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req) as response:
-                data = json.loads(response.read().decode('utf-8'))
-                
-                # 記事IDのリストを作成
-                article_ids = [article['id'] for article in data]
+                query.offset(offset)
+            
+            data = query.execute().data or []
+            if limit > 0 and len(data) > limit:
+                data = data[:limit]
+                self.next_cursor = self.encode_cursor(data[-1])
+            log.debug("articles listed", count=len(data), query=query.query_string())
+            return data
                 
-                # 一括でコメント数を取得
-                if article_ids:
-                    comment_counts = self.get_articles_comment_counts(article_ids)
-                    # 各記事にコメント数を追加
-                    for article in data:
-                        article['comment_count'] = comment_counts.get(article['id'], 0)
-                
-                # コメントフィルタリングを適用
-                if has_comments:
-                    if has_comments == 'with_comments':
-                        filtered_data = [article for article in data if article.get('comment_count', 0) > 0]
-                    elif has_comments == 'no_comments':
-                        filtered_data = [article for article in data if article.get('comment_count', 0) == 0]
-                    else:
-                        filtered_data = data
-                    
-                    # フィルタリング後にページネーションを適用
-                    start_idx = offset
-                    end_idx = offset + limit
-                    data = filtered_data[start_idx:end_idx]
-                
-                print(f"DEBUG: Articles count: {len(data)}")
-                return data
-                
-        except urllib.error.HTTPError as e:
-            print(f"Get articles HTTP error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error body: {error_body}")
+        except SupabaseError as e:
+            log.error("Get articles HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
             return None
         except Exception as e:
-            print(f"Get articles error: {e}")
+            log.error("Get articles error", error=str(e))
             return None
 
     def get_single_article(self, article_id):
         """単一記事を取得"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
-            # 単一記事を取得（ai_summaryフィールドも含める）
-            url = f"{supabase_url}/rest/v1/articles?select=*,sources(name,domain)&id=eq.{article_id}"
+            # 単一記事を取得（ai_summary・comment_count フィールドも含める）
+            data = get_client().table('articles').select('*,sources(name,domain)').eq('id', article_id).execute().data
             
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            print(f"DEBUG: Single article URL: {url}")
-            
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req) as response:
-                data = json.loads(response.read().decode('utf-8'))
+            log.debug("single article", article_id=article_id, found=bool(data))
+            return data or []
                 
-                if data:
-                    # コメント数を取得
-                    comment_counts = self.get_articles_comment_counts([article_id])
-                    data[0]['comment_count'] = comment_counts.get(article_id, 0)
-                    
-                    print(f"DEBUG: Single article found: {data[0].get('title', 'No title')}")
-                    return data
-                else:
-                    print(f"DEBUG: No article found with id: {article_id}")
-                    return []
-                
-        except urllib.error.HTTPError as e:
-            print(f"Get single article HTTP error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error body: {error_body}")
+        except SupabaseError as e:
+            log.error("Get single article HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
             return None
         except Exception as e:
-            print(f"Get single article error: {e}")
+            log.error("Get single article error", error=str(e))
             return None
     
-    def get_articles_comment_counts(self, article_ids):
-        """複数記事のコメント数を一括取得"""
-        try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return {}
-            
-            # 記事IDのリストをカンマ区切りの文字列に変換
-            ids_str = ','.join(f'"{id}"' for id in article_ids)
-            
-            # 一括でコメントデータを取得（削除されていないもののみ）
-            url = f"{supabase_url}/rest/v1/article_comments?article_id=in.({ids_str})&is_deleted=eq.false&select=article_id"
-            
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req) as response:
-                comments = json.loads(response.read().decode('utf-8'))
-                
-                # 記事IDごとのコメント数を集計
-                comment_counts = {}
-                for comment in comments:
-                    article_id = comment['article_id']
-                    comment_counts[article_id] = comment_counts.get(article_id, 0) + 1
-                
-                # 全ての記事IDに対して結果を返す（コメントがない記事は0）
-                result = {}
-                for article_id in article_ids:
-                    result[article_id] = comment_counts.get(article_id, 0)
-                
-                return result
-        
-        except Exception as e:
-            print(f"Get comments count error: {str(e)}")
-            return {}
-    
     def get_articles_count(self, query_params=None):
-        """記事の総数を取得（フィルタリング対応）"""
+        """
+        記事の総数を取得（フィルタリング対応）
+        count=exact|planned|estimated で数え方を選べる。未指定なら、フィルタ無しの総数は
+        estimated（件数が多ければ統計情報からの推定値）、フィルタ付きは exact。
+        結果はフィルタ・モードごとに COUNT_CACHE_TTL 秒キャッシュする。
+        """
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return 0
-            
             if query_params is None:
                 query_params = {}
             
-            # パラメータを取得
-            status = query_params.get('status', [None])[0]
-            flagged = query_params.get('flagged', [None])[0]
-            source_id = query_params.get('source_id', [None])[0]
-            has_comments = query_params.get('has_comments', [None])[0]
-            
-            # ベースURLを構築（カウントのみ）
-            url = f"{supabase_url}/rest/v1/articles?select=id"
-            
-            # フィルタリングを追加
-            filters = []
-            if status:
-                filters.append(f"status=eq.{status}")
-            if flagged is not None:
-                flag_value = 'true' if flagged.lower() == 'true' else 'false'
-                filters.append(f"flagged=eq.{flag_value}")
-            if source_id:
-                filters.append(f"source_id=eq.{source_id}")
-            
-            if filters:
-                url += "&" + "&".join(filters)
-            
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json',
-                'Prefer': 'count=exact'
-            }
+            filters = self.build_filters(query_params)
+            mode = query_params.get('count', [None])[0] or ('exact' if filters else 'estimated')
+            if mode not in COUNT_MODES:
+                mode = 'exact'
             
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req) as response:
-                # コメントフィルタリングがある場合は、データを取得してフィルタリング後にカウント
-                if has_comments:
-                    # 記事とコメント数を取得
-                    articles_data = json.loads(response.read().decode('utf-8'))
-                    article_ids = [article['id'] for article in articles_data]
-                    
-                    if article_ids:
-                        comment_counts = self.get_articles_comment_counts(article_ids)
-                        # フィルタリング適用
-                        if has_comments == 'with_comments':
-                            filtered_count = sum(1 for article_id in article_ids if comment_counts.get(article_id, 0) > 0)
-                        elif has_comments == 'no_comments':
-                            filtered_count = sum(1 for article_id in article_ids if comment_counts.get(article_id, 0) == 0)
-                        else:
-                            filtered_count = len(articles_data)
-                        return filtered_count
-                    else:
-                        return 0
-                else:
-                    # Content-Rangeヘッダーからカウントを取得
-                    content_range = response.headers.get('Content-Range', '')
-                    if content_range and '/' in content_range:
-                        count = int(content_range.split('/')[-1])
-                        return count
-                    else:
-                        # フォールバック: データを取得してカウント
-                        data = json.loads(response.read().decode('utf-8'))
-                        return len(data)
+            cache_key = (tuple(sorted(filters, key=repr)), mode)
+            cached = get_cached_count(cache_key)
+            if cached is not None:
+                return cached
+            
+            # 件数は Content-Range から読むので行そのものは 1 件だけ返させる
+            query = get_client().table('articles').select('id', count=mode).limit(1)
+            for column, operator, value in filters:
+                query.filter(column, operator, value)
+            
+            count = query.execute().count
+            if count is None:
+                return 0
+            store_count(cache_key, count)
+            return count
                 
         except Exception as e:
-            print(f"Get articles count error: {e}")
+            log.error("Get articles count error", error=str(e))
             return 0
 
     def add_article(self, data, user_data):
         """記事を追加"""
         try:
-            print(f"DEBUG: Add article called with data: {data}")
-            print(f"DEBUG: User data: {user_data}")
-            
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                print("DEBUG: Missing environment variables")
-                return None
-            
             # 必須フィールドの確認
             if not data.get('url') or not data.get('title'):
-                print("DEBUG: Missing required fields (url or title)")
+                log.warning("add article: url or title missing", user_id=user_data.get('user_id'))
                 return None
             
             # articlesテーブル用のデータを準備
@@ -569,57 +462,26 @@ class handler(BaseHTTPRequestHandler):
                 'published_at': data.get('published_at', today_jst_iso())
             }
             
-            print(f"DEBUG: Item data to insert: {item_data}")
-            
             # データベースに追加
-            url = f"{supabase_url}/rest/v1/articles"
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json',
-                'Prefer': 'return=representation'
-            }
-            
-            print(f"DEBUG: Supabase URL: {url}")
+            result = get_client().table('articles').insert(item_data).execute().data
+            # 件数が変わるので件数キャッシュを破棄
+            invalidate_counts()
             
-            req = urllib.request.Request(
-                url, 
-                data=json.dumps(item_data).encode('utf-8'),
-                headers=headers,
-                method='POST'
-            )
-            
-            with urllib.request.urlopen(req) as response:
-                response_body = response.read().decode('utf-8')
-                print(f"DEBUG: Response body: {response_body}")
-                print(f"DEBUG: Response status: {response.getcode()}")
-                
-                if response_body.strip():
-                    result = json.loads(response_body)
-                    print(f"DEBUG: Insert result: {result}")
-                    return result[0] if isinstance(result, list) and result else result
-                else:
-                    print("DEBUG: Empty response from Supabase")
-                    return {"success": True, "message": "Item inserted successfully"}
+            if result:
+                return result[0] if isinstance(result, list) else result
+            else:
+                return {"success": True, "message": "Item inserted successfully"}
                 
-        except urllib.error.HTTPError as e:
-            print(f"Add article HTTP error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error body: {error_body}")
+        except SupabaseError as e:
+            log.error("Add article HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
             return None
         except Exception as e:
-            print(f"Add article error: {e}")
+            log.error("Add article error", error=str(e))
             return None
 
     def update_article(self, article_id, data, user_data):
         """記事を更新"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
             # 更新データを準備
             update_data = {}
             if data.get('title'):
@@ -643,82 +505,40 @@ class handler(BaseHTTPRequestHandler):
             update_data['reviewer'] = user_data['user_id']
             
             # データベースを更新
-            url = f"{supabase_url}/rest/v1/articles?id=eq.{article_id}"
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json',
-                'Prefer': 'return=representation'
-            }
+            result = get_client().table('articles').update(update_data).eq('id', article_id).execute().data
+            # ステータス・フラグ別の件数が変わるので件数キャッシュを破棄
+            invalidate_counts()
             
-            req = urllib.request.Request(
-                url,
-                data=json.dumps(update_data).encode('utf-8'),
-                headers=headers,
-                method='PATCH'
-            )
-            
-            with urllib.request.urlopen(req) as response:
-                response_body = response.read().decode('utf-8')
-                if response_body.strip():
-                    result = json.loads(response_body)
-                    return result[0] if isinstance(result, list) and result else result
-                else:
-                    return {"success": True, "message": "Item updated successfully"}
+            if result:
+                return result[0] if isinstance(result, list) else result
+            else:
+                return {"success": True, "message": "Item updated successfully"}
                     
-        except urllib.error.HTTPError as e:
-            print(f"Update article HTTP error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error body: {error_body}")
+        except SupabaseError as e:
+            log.error("Update article HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
             return None
         except Exception as e:
-            print(f"Update article error: {e}")
+            log.error("Update article error", error=str(e))
             return None
 
     def delete_article(self, article_id, user_data):
         """記事を削除"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
             # データベースから削除
-            url = f"{supabase_url}/rest/v1/articles?id=eq.{article_id}"
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            req = urllib.request.Request(
-                url,
-                headers=headers,
-                method='DELETE'
-            )
-            
-            with urllib.request.urlopen(req) as response:
-                return True
+            get_client().table('articles').delete().eq('id', article_id).execute()
+            invalidate_counts()
+            return True
                     
-        except urllib.error.HTTPError as e:
-            print(f"Delete article HTTP error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error body: {error_body}")
+        except SupabaseError as e:
+            log.error("Delete article HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
             return None
         except Exception as e:
-            print(f"Delete article error: {e}")
+            log.error("Delete article error", error=str(e))
             return None
     
     def update_ai_summary(self, article_id, ai_summary, user_data):
         """記事のAI要約を更新"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
             # AI要約データを準備
             update_data = {
                 'ai_summary': ai_summary,
@@ -727,33 +547,13 @@ class handler(BaseHTTPRequestHandler):
             }
             
             # データベースを更新
-            url = f"{supabase_url}/rest/v1/articles?id=eq.{article_id}"
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json',
-                'Prefer': 'return=representation'
-            }
-            
-            data = json.dumps(update_data).encode('utf-8')
-            
-            req = urllib.request.Request(
-                url,
-                data=data,
-                headers=headers,
-                method='PATCH'
-            )
-            
-            with urllib.request.urlopen(req) as response:
-                result = json.loads(response.read().decode('utf-8'))
-                print(f"DEBUG: AI summary updated for article {article_id}")
-                return result[0] if isinstance(result, list) and result else result
+            result = get_client().table('articles').update(update_data).eq('id', article_id).execute().data
+            log.debug("ai summary updated", article_id=article_id)
+            return result[0] if isinstance(result, list) and result else result
                     
-        except urllib.error.HTTPError as e:
-            print(f"Update AI summary HTTP error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error body: {error_body}")
+        except SupabaseError as e:
+            log.error("Update AI summary HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
             return None
         except Exception as e:
-            print(f"Update AI summary error: {e}")
-            return None
\ No newline at end of file
+            log.error("Update AI summary error", error=str(e))
+            return None
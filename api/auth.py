@@ -2,12 +2,18 @@ from http.server import BaseHTTPRequestHandler
 import json
 import hashlib
 import os
-import urllib.request
-import urllib.parse
 import uuid
 import jwt
 import datetime
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.supabase_rest import get_client
+from utils.jwt_auth import JWT_SECRET
+from utils.log import get_logger, log_requests
 
+log = get_logger("api.auth")
+
+@log_requests(log)
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
         self.send_response(200)
@@ -82,27 +88,13 @@ class handler(BaseHTTPRequestHandler):
     def get_user_from_supabase(self, user_id):
         """Supabaseからユーザー情報を取得"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
             # Supabase API呼び出し（必要なフィールドを明示的に選択）
-            url = f"{supabase_url}/rest/v1/users?user_id=eq.{user_id}&select=user_id,display_name,role,password_hash,password_salt"
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req) as response:
-                data = json.loads(response.read().decode('utf-8'))
-                return data[0] if data else None
+            data = (get_client().table('users').select('user_id,display_name,role,password_hash,password_salt')
+                    .eq('user_id', user_id).execute().data)
+            return data[0] if data else None
                 
         except Exception as e:
-            print(f"Supabase error: {e}")
+            log.error("Supabase error", error=str(e))
             return None
     
     def verify_password(self, password, user_data):
@@ -125,20 +117,19 @@ class handler(BaseHTTPRequestHandler):
                 # 平文パスワードの場合（後方互換性）
                 return password == user_data['password_hash']
         except Exception as e:
-            print(f"Password verification error: {e}")
+            log.error("Password verification error", error=str(e))
             return False
     
     def generate_jwt_token(self, user_data):
         """JWTトークン生成"""
         try:
-            secret = os.environ.get('JWT_SECRET', 'default-secret-key')
             payload = {
                 'user_id': user_data['user_id'],
                 'display_name': user_data.get('display_name'),
                 'role': user_data['role'],
                 'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=24)
             }
-            return jwt.encode(payload, secret, algorithm='HS256')
+            return jwt.encode(payload, JWT_SECRET, algorithm='HS256')
         except Exception as e:
-            print(f"JWT generation error: {e}")
+            log.error("JWT generation error", error=str(e))
             return str(uuid.uuid4())  # フォールバック用のランダムトークン
\ No newline at end of file
@@ -1,13 +1,17 @@
 from http.server import BaseHTTPRequestHandler
 import json
 import os
-import jwt
-import urllib.request
 import datetime
 import sys
-sys.path.append('/mnt/f/OneDrive - 株式会社羽生田鉄工所/Git/cfrp-monitor')
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.timezone_utils import format_jst_display
+from utils.supabase_rest import get_client
+from utils.jwt_auth import verify_bearer
+from utils.log import get_logger, log_requests
 
+log = get_logger("api.layout")
+
+@log_requests(log)
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         self.send_response(200)
@@ -60,26 +64,8 @@ class handler(BaseHTTPRequestHandler):
         self.end_headers()
 
     def verify_token(self):
-        """JWTトークンの検証"""
-        try:
-            auth_header = self.headers.get('Authorization')
-            
-            if not auth_header or not auth_header.startswith('Bearer '):
-                return None
-            
-            token = auth_header.split(' ')[1]
-            secret = os.environ.get('JWT_SECRET', 'default-secret-key')
-            
-            # トークンをデコード
-            payload = jwt.decode(token, secret, algorithms=['HS256'])
-            return payload
-            
-        except jwt.ExpiredSignatureError:
-            return None
-        except jwt.InvalidTokenError:
-            return None
-        except Exception:
-            return None
+        """JWTトークンの検証（検証済みトークンは utils/jwt_auth.py でキャッシュ）"""
+        return verify_bearer(self.headers.get('Authorization'))
 
     def generate_layout(self, user_data):
         """ユーザー権限に基づいてレイアウト設定を生成"""
@@ -159,64 +145,49 @@ class handler(BaseHTTPRequestHandler):
     def get_last_updated_stats(self):
         """記事管理と情報源管理の最終更新時刻を取得"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json'
-            }
-            
+            client = get_client()
             stats = {}
             
             # 記事の最終更新を取得（追加日時または確認日時の新しい方）
             try:
-                articles_url = f"{supabase_url}/rest/v1/articles?select=added_at,reviewed_at&order=added_at.desc&limit=1"
-                req = urllib.request.Request(articles_url, headers=headers)
-                with urllib.request.urlopen(req) as response:
-                    articles_data = json.loads(response.read().decode('utf-8'))
-                    if articles_data:
-                        latest_article = articles_data[0]
-                        # reviewed_atがあればそれを、なければadded_atを使用
-                        article_updated = latest_article.get('reviewed_at') or latest_article.get('added_at')
-                        if article_updated:
-                            # ユーティリティ関数でJST表示形式に変換
-                            stats['articles'] = format_jst_display(article_updated)
-                        else:
-                            stats['articles'] = None
+                articles_data = (client.table('articles').select('added_at,reviewed_at')
+                                 .order('added_at', desc=True).limit(1).execute().data)
+                if articles_data:
+                    latest_article = articles_data[0]
+                    # reviewed_atがあればそれを、なければadded_atを使用
+                    article_updated = latest_article.get('reviewed_at') or latest_article.get('added_at')
+                    if article_updated:
+                        # ユーティリティ関数でJST表示形式に変換
+                        stats['articles'] = format_jst_display(article_updated)
                     else:
                         stats['articles'] = None
+                else:
+                    stats['articles'] = None
             except Exception as e:
-                print(f"Articles last updated error: {e}")
+                log.error("Articles last updated error", error=str(e))
                 stats['articles'] = None
             
             # 情報源の最終更新を取得（収集日時または更新日時の新しい方）
             try:
-                sources_url = f"{supabase_url}/rest/v1/sources?select=updated_at,last_collected_at&order=updated_at.desc&limit=1"
-                req = urllib.request.Request(sources_url, headers=headers)
-                with urllib.request.urlopen(req) as response:
-                    sources_data = json.loads(response.read().decode('utf-8'))
-                    if sources_data:
-                        latest_source = sources_data[0]
-                        # last_collected_atがあればそれを、なければupdated_atを使用
-                        source_updated = latest_source.get('last_collected_at') or latest_source.get('updated_at')
-                        if source_updated:
-                            # ユーティリティ関数でJST表示形式に変換
-                            stats['sources'] = format_jst_display(source_updated)
-                        else:
-                            stats['sources'] = None
+                sources_data = (client.table('sources').select('updated_at,last_collected_at')
+                                .order('updated_at', desc=True).limit(1).execute().data)
+                if sources_data:
+                    latest_source = sources_data[0]
+                    # last_collected_atがあればそれを、なければupdated_atを使用
+                    source_updated = latest_source.get('last_collected_at') or latest_source.get('updated_at')
+                    if source_updated:
+                        # ユーティリティ関数でJST表示形式に変換
+                        stats['sources'] = format_jst_display(source_updated)
                     else:
                         stats['sources'] = None
+                else:
+                    stats['sources'] = None
             except Exception as e:
-                print(f"Sources last updated error: {e}")
+                log.error("Sources last updated error", error=str(e))
                 stats['sources'] = None
             
             return stats
                 
         except Exception as e:
-            print(f"Get last updated stats error: {e}")
+            log.error("Get last updated stats error", error=str(e))
             return None
\ No newline at end of file
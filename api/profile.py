@@ -1,13 +1,16 @@
 from http.server import BaseHTTPRequestHandler
 import json
 import os
-import jwt
-import urllib.request
-import urllib.parse
 import sys
-sys.path.append('/mnt/f/OneDrive - 株式会社羽生田鉄工所/Git/cfrp-monitor')
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.timezone_utils import now_jst_naive_iso
+from utils.supabase_rest import get_client, SupabaseError
+from utils.jwt_auth import verify_bearer
+from utils.log import get_logger, log_requests
 
+log = get_logger("api.profile")
+
+@log_requests(log)
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         """現在のユーザーのプロフィール情報を取得"""
@@ -107,62 +110,23 @@ class handler(BaseHTTPRequestHandler):
         self.end_headers()
 
     def verify_token(self):
-        """JWTトークンの検証"""
-        try:
-            auth_header = self.headers.get('Authorization')
-            
-            if not auth_header or not auth_header.startswith('Bearer '):
-                return None
-            
-            token = auth_header.split(' ')[1]
-            secret = os.environ.get('JWT_SECRET', 'default-secret-key')
-            
-            # トークンをデコード
-            payload = jwt.decode(token, secret, algorithms=['HS256'])
-            return payload
-            
-        except jwt.ExpiredSignatureError:
-            return None
-        except jwt.InvalidTokenError:
-            return None
-        except Exception:
-            return None
+        """JWTトークンの検証（検証済みトークンは utils/jwt_auth.py でキャッシュ）"""
+        return verify_bearer(self.headers.get('Authorization'))
 
     def get_user_profile(self, user_id):
         """ユーザーのプロフィール情報を取得"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
-            url = f"{supabase_url}/rest/v1/users?user_id=eq.{user_id}&select=user_id,display_name,role,created_at"
-            
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req) as response:
-                data = json.loads(response.read().decode('utf-8'))
-                return data[0] if data else None
+            data = (get_client().table('users').select('user_id,display_name,role,created_at')
+                    .eq('user_id', user_id).execute().data)
+            return data[0] if data else None
                 
         except Exception as e:
-            print(f"Get user profile error: {str(e)}")
+            log.error("Get user profile error", error=str(e))
             return None
 
     def update_profile(self, user_id, data):
         """ユーザーのプロフィールを更新"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
             # 更新データを準備
             update_data = {}
             
@@ -190,36 +154,17 @@ class handler(BaseHTTPRequestHandler):
             if not update_data:
                 return None
             
-            url = f"{supabase_url}/rest/v1/users?user_id=eq.{user_id}"
-            
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json',
-                'Prefer': 'return=representation'
-            }
-            
-            req = urllib.request.Request(
-                url, 
-                data=json.dumps(update_data).encode('utf-8'),
-                headers=headers,
-                method='PATCH'
-            )
-            
-            with urllib.request.urlopen(req) as response:
-                result = json.loads(response.read().decode('utf-8'))
-                # パスワード情報を隠して返す
-                safe_result = result[0] if isinstance(result, list) and result else result
-                if safe_result:
-                    safe_result.pop('password_hash', None)
-                    safe_result.pop('password_salt', None)
-                return safe_result
+            result = get_client().table('users').update(update_data).eq('user_id', user_id).execute().data
+            # パスワード情報を隠して返す
+            safe_result = result[0] if isinstance(result, list) and result else result
+            if safe_result:
+                safe_result.pop('password_hash', None)
+                safe_result.pop('password_salt', None)
+            return safe_result
                 
-        except urllib.error.HTTPError as e:
-            print(f"Update profile HTTP error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error body: {error_body}")
+        except SupabaseError as e:
+            log.error("Update profile HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
             return None
         except Exception as e:
-            print(f"Update profile error: {str(e)}")
+            log.error("Update profile error", error=str(e))
             return None
\ No newline at end of file
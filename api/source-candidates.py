@@ -1,14 +1,18 @@
 from http.server import BaseHTTPRequestHandler
 import json
 import os
-import urllib.request
 import urllib.parse
-import jwt
 import datetime
 import sys
-sys.path.append('/mnt/f/OneDrive - 株式会社羽生田鉄工所/Git/cfrp-monitor')
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.timezone_utils import now_jst_naive_iso
+from utils.supabase_rest import get_client, SupabaseError
+from utils.jwt_auth import verify_bearer
+from utils.log import get_logger, log_requests
 
+log = get_logger("api.source-candidates")
+
+@log_requests(log)
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         self.send_response(200)
@@ -251,67 +255,26 @@ class handler(BaseHTTPRequestHandler):
         self.end_headers()
 
     def verify_token(self):
-        """JWTトークンの検証"""
-        try:
-            auth_header = self.headers.get('Authorization')
-            
-            if not auth_header or not auth_header.startswith('Bearer '):
-                return None
-            
-            token = auth_header.split(' ')[1]
-            secret = os.environ.get('JWT_SECRET', 'default-secret-key')
-            
-            # トークンをデコード
-            payload = jwt.decode(token, secret, algorithms=['HS256'])
-            return payload
-            
-        except jwt.ExpiredSignatureError:
-            return None
-        except jwt.InvalidTokenError:
-            return None
-        except Exception:
-            return None
+        """JWTトークンの検証（検証済みトークンは utils/jwt_auth.py でキャッシュ）"""
+        return verify_bearer(self.headers.get('Authorization'))
 
     def get_source_candidates(self):
         """情報源候補一覧を取得"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
             # source_candidatesテーブルから候補を取得
-            url = f"{supabase_url}/rest/v1/source_candidates?select=*&order=discovered_at.desc&limit=100"
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req) as response:
-                data = json.loads(response.read().decode('utf-8'))
-                return data
+            return (get_client().table('source_candidates').select('*')
+                    .order('discovered_at', desc=True).limit(100).execute().data)
                 
-        except urllib.error.HTTPError as e:
-            print(f"Get source candidates HTTP error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error body: {error_body}")
+        except SupabaseError as e:
+            log.error("Get source candidates HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
             return None
         except Exception as e:
-            print(f"Get source candidates error: {e}")
+            log.error("Get source candidates error", error=str(e))
             return None
 
     def add_source_candidate(self, data, user_data):
         """情報源候補を追加"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
             # 必須フィールドの確認
             if not data.get('name') or not data.get('domain') or not data.get('urls'):
                 return None
@@ -334,47 +297,22 @@ class handler(BaseHTTPRequestHandler):
             }
             
             # データベースに追加
-            url = f"{supabase_url}/rest/v1/source_candidates"
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json',
-                'Prefer': 'return=representation'
-            }
-            
-            req = urllib.request.Request(
-                url, 
-                data=json.dumps(candidate_data).encode('utf-8'),
-                headers=headers,
-                method='POST'
-            )
-            
-            with urllib.request.urlopen(req) as response:
-                response_body = response.read().decode('utf-8')
-                if response_body.strip():
-                    result = json.loads(response_body)
-                    return result[0] if isinstance(result, list) and result else result
-                else:
-                    return {"success": True, "message": "Source candidate inserted successfully"}
+            result = get_client().table('source_candidates').insert(candidate_data).execute().data
+            if result:
+                return result[0] if isinstance(result, list) else result
+            else:
+                return {"success": True, "message": "Source candidate inserted successfully"}
                 
-        except urllib.error.HTTPError as e:
-            print(f"Add source candidate HTTP error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error body: {error_body}")
+        except SupabaseError as e:
+            log.error("Add source candidate HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
             return None
         except Exception as e:
-            print(f"Add source candidate error: {e}")
+            log.error("Add source candidate error", error=str(e))
             return None
 
     def update_source_candidate(self, candidate_id, data, user_data):
         """情報源候補を更新"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
             # 更新データを準備
             update_data = {}
             if data.get('name'):
@@ -406,69 +344,29 @@ class handler(BaseHTTPRequestHandler):
                 update_data['metadata'] = data['metadata']
             
             # データベースを更新
-            url = f"{supabase_url}/rest/v1/source_candidates?id=eq.{candidate_id}"
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json',
-                'Prefer': 'return=representation'
-            }
-            
-            req = urllib.request.Request(
-                url,
-                data=json.dumps(update_data).encode('utf-8'),
-                headers=headers,
-                method='PATCH'
-            )
-            
-            with urllib.request.urlopen(req) as response:
-                response_body = response.read().decode('utf-8')
-                if response_body.strip():
-                    result = json.loads(response_body)
-                    return result[0] if isinstance(result, list) and result else result
-                else:
-                    return {"success": True, "message": "Source candidate updated successfully"}
+            result = get_client().table('source_candidates').update(update_data).eq('id', candidate_id).execute().data
+            if result:
+                return result[0] if isinstance(result, list) else result
+            else:
+                return {"success": True, "message": "Source candidate updated successfully"}
                     
-        except urllib.error.HTTPError as e:
-            print(f"Update source candidate HTTP error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error body: {error_body}")
+        except SupabaseError as e:
+            log.error("Update source candidate HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
             return None
         except Exception as e:
-            print(f"Update source candidate error: {e}")
+            log.error("Update source candidate error", error=str(e))
             return None
 
     def delete_source_candidate(self, candidate_id, user_data):
         """情報源候補を削除"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
             # データベースから物理削除
-            url = f"{supabase_url}/rest/v1/source_candidates?id=eq.{candidate_id}"
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            req = urllib.request.Request(
-                url,
-                headers=headers,
-                method='DELETE'
-            )
-            
-            with urllib.request.urlopen(req) as response:
-                return True
+            get_client().table('source_candidates').delete().eq('id', candidate_id).execute()
+            return True
                     
-        except urllib.error.HTTPError as e:
-            print(f"Delete source candidate HTTP error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error body: {error_body}")
+        except SupabaseError as e:
+            log.error("Delete source candidate HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
             return None
         except Exception as e:
-            print(f"Delete source candidate error: {e}")
+            log.error("Delete source candidate error", error=str(e))
             return None
\ No newline at end of file
@@ -1,14 +1,18 @@
 from http.server import BaseHTTPRequestHandler
 import json
 import os
-import urllib.request
 import urllib.parse
-import jwt
 import datetime
 import sys
-sys.path.append('/mnt/f/OneDrive - 株式会社羽生田鉄工所/Git/cfrp-monitor')
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.timezone_utils import now_jst_naive_iso
+from utils.supabase_rest import get_client, SupabaseError
+from utils.jwt_auth import verify_bearer
+from utils.log import get_logger, log_requests
 
+log = get_logger("api.sources")
+
+@log_requests(log)
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         self.send_response(200)
@@ -250,109 +254,45 @@ class handler(BaseHTTPRequestHandler):
         self.end_headers()
 
     def verify_token(self):
-        """JWTトークンの検証"""
-        try:
-            auth_header = self.headers.get('Authorization')
-            
-            if not auth_header or not auth_header.startswith('Bearer '):
-                return None
-            
-            token = auth_header.split(' ')[1]
-            secret = os.environ.get('JWT_SECRET', 'default-secret-key')
-            
-            # トークンをデコード
-            payload = jwt.decode(token, secret, algorithms=['HS256'])
-            return payload
-            
-        except jwt.ExpiredSignatureError:
-            return None
-        except jwt.InvalidTokenError:
-            return None
-        except Exception:
-            return None
+        """JWTトークンの検証（検証済みトークンは utils/jwt_auth.py でキャッシュ）"""
+        return verify_bearer(self.headers.get('Authorization'))
 
     def get_sources(self):
         """情報源一覧を取得"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
             # sourcesテーブルから情報源を取得
-            url = f"{supabase_url}/rest/v1/sources?select=*&order=updated_at.desc&limit=100"
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req) as response:
-                data = json.loads(response.read().decode('utf-8'))
-                return data
+            return get_client().table('sources').select('*').order('updated_at', desc=True).limit(100).execute().data
                 
-        except urllib.error.HTTPError as e:
-            print(f"Get sources HTTP error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error body: {error_body}")
+        except SupabaseError as e:
+            log.error("Get sources HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
             return None
         except Exception as e:
-            print(f"Get sources error: {e}")
+            log.error("Get sources error", error=str(e))
             return None
     
     def get_used_sources(self):
-        """記事が存在する情報源のみを取得"""
+        """
+        記事が存在する情報源のみを取得
+        記事数は sources.article_count（トリガで維持, sql/005_source_article_stats.sql）を見るので、
+        記事の件数に関係なく sources を 1 回読むだけで済む。
+        """
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
-            # まず記事に使用されているsource_idを取得
-            articles_url = f"{supabase_url}/rest/v1/articles?select=source_id"
-            
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            req = urllib.request.Request(articles_url, headers=headers)
-            with urllib.request.urlopen(req) as response:
-                articles_data = json.loads(response.read().decode('utf-8'))
-                
-                # 使用されているsource_idを抽出（重複除去）
-                used_source_ids = list(set([article['source_id'] for article in articles_data if article.get('source_id')]))
-                
-                if not used_source_ids:
-                    return []
-                
-                # 使用されているsource_idに対応する情報源を取得
-                ids_str = ','.join(f'"{id}"' for id in used_source_ids)
-                sources_url = f"{supabase_url}/rest/v1/sources?select=*&id=in.({ids_str})&order=name.asc"
-                
-                req = urllib.request.Request(sources_url, headers=headers)
-                with urllib.request.urlopen(req) as response:
-                    sources_data = json.loads(response.read().decode('utf-8'))
-                    print(f"DEBUG: Used sources count: {len(sources_data)}")
-                    return sources_data
+            sources_data = (get_client().table('sources')
+                            .select('id,name,domain,article_count,last_article_at')
+                            .gt('article_count', 0).order('name').execute().data)
+            log.debug("used sources", count=len(sources_data))
+            return sources_data
                 
+        except SupabaseError as e:
+            log.error("Get used sources HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
+            return None
         except Exception as e:
-            print(f"Get used sources error: {e}")
+            log.error("Get used sources error", error=str(e))
             return None
 
     def add_source(self, data, user_data):
         """情報源を追加"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
             # 必須フィールドの確認
             if not data.get('name') or not data.get('domain'):
                 return None
@@ -381,47 +321,22 @@ class handler(BaseHTTPRequestHandler):
             }
             
             # データベースに追加
-            url = f"{supabase_url}/rest/v1/sources"
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json',
-                'Prefer': 'return=representation'
-            }
-            
-            req = urllib.request.Request(
-                url, 
-                data=json.dumps(source_data).encode('utf-8'),
-                headers=headers,
-                method='POST'
-            )
-            
-            with urllib.request.urlopen(req) as response:
-                response_body = response.read().decode('utf-8')
-                if response_body.strip():
-                    result = json.loads(response_body)
-                    return result[0] if isinstance(result, list) and result else result
-                else:
-                    return {"success": True, "message": "Source inserted successfully"}
+            result = get_client().table('sources').insert(source_data).execute().data
+            if result:
+                return result[0] if isinstance(result, list) else result
+            else:
+                return {"success": True, "message": "Source inserted successfully"}
                 
-        except urllib.error.HTTPError as e:
-            print(f"Add source HTTP error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error body: {error_body}")
+        except SupabaseError as e:
+            log.error("Add source HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
             return None
         except Exception as e:
-            print(f"Add source error: {e}")
+            log.error("Add source error", error=str(e))
             return None
 
     def update_source(self, source_id, data, user_data):
         """情報源を更新"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
             # 更新データを準備
             update_data = {}
             if data.get('name'):
@@ -464,47 +379,22 @@ class handler(BaseHTTPRequestHandler):
             update_data['updated_at'] = now_jst_naive_iso()
             
             # データベースを更新
-            url = f"{supabase_url}/rest/v1/sources?id=eq.{source_id}"
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json',
-                'Prefer': 'return=representation'
-            }
-            
-            req = urllib.request.Request(
-                url,
-                data=json.dumps(update_data).encode('utf-8'),
-                headers=headers,
-                method='PATCH'
-            )
-            
-            with urllib.request.urlopen(req) as response:
-                response_body = response.read().decode('utf-8')
-                if response_body.strip():
-                    result = json.loads(response_body)
-                    return result[0] if isinstance(result, list) and result else result
-                else:
-                    return {"success": True, "message": "Source updated successfully"}
+            result = get_client().table('sources').update(update_data).eq('id', source_id).execute().data
+            if result:
+                return result[0] if isinstance(result, list) else result
+            else:
+                return {"success": True, "message": "Source updated successfully"}
                     
-        except urllib.error.HTTPError as e:
-            print(f"Update source HTTP error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error body: {error_body}")
+        except SupabaseError as e:
+            log.error("Update source HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
             return None
         except Exception as e:
-            print(f"Update source error: {e}")
+            log.error("Update source error", error=str(e))
             return None
 
     def delete_source(self, source_id, user_data):
         """情報源を削除（論理削除）"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
             # 論理削除（deletedフラグを立てる）
             update_data = {
                 'deleted': True,
@@ -512,28 +402,12 @@ class handler(BaseHTTPRequestHandler):
                 'updated_at': now_jst_naive_iso()
             }
             
-            url = f"{supabase_url}/rest/v1/sources?id=eq.{source_id}"
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            req = urllib.request.Request(
-                url,
-                data=json.dumps(update_data).encode('utf-8'),
-                headers=headers,
-                method='PATCH'
-            )
-            
-            with urllib.request.urlopen(req) as response:
-                return True
+            get_client().table('sources').update(update_data, returning=False).eq('id', source_id).execute()
+            return True
                     
-        except urllib.error.HTTPError as e:
-            print(f"Delete source HTTP error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error body: {error_body}")
+        except SupabaseError as e:
+            log.error("Delete source HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
             return None
         except Exception as e:
-            print(f"Delete source error: {e}")
+            log.error("Delete source error", error=str(e))
             return None
\ No newline at end of file
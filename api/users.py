@@ -1,16 +1,20 @@
 from http.server import BaseHTTPRequestHandler
 import json
 import os
-import urllib.request
 import urllib.parse
-import jwt
 import datetime
 import hashlib
 import secrets
 import sys
-sys.path.append('/mnt/f/OneDrive - 株式会社羽生田鉄工所/Git/cfrp-monitor')
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.timezone_utils import now_jst_naive_iso
+from utils.supabase_rest import get_client, SupabaseError
+from utils.jwt_auth import verify_bearer
+from utils.log import get_logger, log_requests
 
+log = get_logger("api.users")
+
+@log_requests(log)
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         self.send_response(200)
@@ -275,67 +279,25 @@ class handler(BaseHTTPRequestHandler):
         self.end_headers()
 
     def verify_token(self):
-        """JWTトークンの検証"""
-        try:
-            auth_header = self.headers.get('Authorization')
-            
-            if not auth_header or not auth_header.startswith('Bearer '):
-                return None
-            
-            token = auth_header.split(' ')[1]
-            secret = os.environ.get('JWT_SECRET', 'default-secret-key')
-            
-            # トークンをデコード
-            payload = jwt.decode(token, secret, algorithms=['HS256'])
-            return payload
-            
-        except jwt.ExpiredSignatureError:
-            return None
-        except jwt.InvalidTokenError:
-            return None
-        except Exception:
-            return None
+        """JWTトークンの検証（検証済みトークンは utils/jwt_auth.py でキャッシュ）"""
+        return verify_bearer(self.headers.get('Authorization'))
 
     def get_users(self):
         """ユーザー一覧を取得"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
             # usersテーブルからユーザーを取得
-            url = f"{supabase_url}/rest/v1/users?select=*&order=created_at.desc"
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req) as response:
-                data = json.loads(response.read().decode('utf-8'))
-                return data
+            return get_client().table('users').select('*').order('created_at', desc=True).execute().data
                 
-        except urllib.error.HTTPError as e:
-            print(f"Get users HTTP error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error body: {error_body}")
+        except SupabaseError as e:
+            log.error("Get users HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
             return None
         except Exception as e:
-            print(f"Get users error: {e}")
+            log.error("Get users error", error=str(e))
             return None
 
     def add_user(self, data, admin_user):
         """ユーザーを追加"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
             # 必須フィールドの確認
             if not data.get('user_id') or not data.get('password'):
                 return None
@@ -361,52 +323,26 @@ class handler(BaseHTTPRequestHandler):
             }
             
             # データベースに追加
-            url = f"{supabase_url}/rest/v1/users"
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json',
-                'Prefer': 'return=representation'
-            }
-            
-            req = urllib.request.Request(
-                url, 
-                data=json.dumps(user_data).encode('utf-8'),
-                headers=headers,
-                method='POST'
-            )
-            
-            with urllib.request.urlopen(req) as response:
-                response_body = response.read().decode('utf-8')
-                if response_body.strip():
-                    result = json.loads(response_body)
-                    # パスワード情報を隠して返す
-                    safe_result = result[0] if isinstance(result, list) and result else result
-                    if safe_result:
-                        safe_result.pop('password_hash', None)
-                        safe_result.pop('password_salt', None)
-                    return safe_result
-                else:
-                    return {"success": True, "message": "User inserted successfully"}
+            result = get_client().table('users').insert(user_data).execute().data
+            if result:
+                # パスワード情報を隠して返す
+                safe_result = result[0] if isinstance(result, list) else result
+                safe_result.pop('password_hash', None)
+                safe_result.pop('password_salt', None)
+                return safe_result
+            else:
+                return {"success": True, "message": "User inserted successfully"}
                 
-        except urllib.error.HTTPError as e:
-            print(f"Add user HTTP error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error body: {error_body}")
+        except SupabaseError as e:
+            log.error("Add user HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
             return None
         except Exception as e:
-            print(f"Add user error: {e}")
+            log.error("Add user error", error=str(e))
             return None
 
     def update_user(self, user_id, data, admin_user):
         """ユーザーを更新"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
             # 更新データを準備
             update_data = {}
             if data.get('display_name'):
@@ -426,73 +362,32 @@ class handler(BaseHTTPRequestHandler):
                 update_data['password_salt'] = salt
             
             # データベースを更新
-            url = f"{supabase_url}/rest/v1/users?user_id=eq.{user_id}"
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json',
-                'Prefer': 'return=representation'
-            }
-            
-            req = urllib.request.Request(
-                url,
-                data=json.dumps(update_data).encode('utf-8'),
-                headers=headers,
-                method='PATCH'
-            )
-            
-            with urllib.request.urlopen(req) as response:
-                response_body = response.read().decode('utf-8')
-                if response_body.strip():
-                    result = json.loads(response_body)
-                    safe_result = result[0] if isinstance(result, list) and result else result
-                    if safe_result:
-                        safe_result.pop('password_hash', None)
-                        safe_result.pop('password_salt', None)
-                    return safe_result
-                else:
-                    return {"success": True, "message": "User updated successfully"}
+            result = get_client().table('users').update(update_data).eq('user_id', user_id).execute().data
+            if result:
+                safe_result = result[0] if isinstance(result, list) else result
+                safe_result.pop('password_hash', None)
+                safe_result.pop('password_salt', None)
+                return safe_result
+            else:
+                return {"success": True, "message": "User updated successfully"}
                     
-        except urllib.error.HTTPError as e:
-            print(f"Update user HTTP error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error body: {error_body}")
+        except SupabaseError as e:
+            log.error("Update user HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
             return None
         except Exception as e:
-            print(f"Update user error: {e}")
+            log.error("Update user error", error=str(e))
             return None
 
     def delete_user(self, user_id, admin_user):
         """ユーザーを削除"""
         try:
-            supabase_url = os.environ.get('SUPABASE_URL')
-            supabase_key = os.environ.get('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                return None
-            
             # データベースから削除
-            url = f"{supabase_url}/rest/v1/users?user_id=eq.{user_id}"
-            headers = {
-                'apikey': supabase_key,
-                'Authorization': f'Bearer {supabase_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            req = urllib.request.Request(
-                url,
-                headers=headers,
-                method='DELETE'
-            )
-            
-            with urllib.request.urlopen(req) as response:
-                return True
+            get_client().table('users').delete().eq('user_id', user_id).execute()
+            return True
                     
-        except urllib.error.HTTPError as e:
-            print(f"Delete user HTTP error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error body: {error_body}")
+        except SupabaseError as e:
+            log.error("Delete user HTTP error", status=e.status, reason=e.reason, body=e.body[:500])
             return None
         except Exception as e:
-            print(f"Delete user error: {e}")
+            log.error("Delete user error", error=str(e))
             return None
\ No newline at end of file
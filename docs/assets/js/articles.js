@@ -14,6 +14,9 @@ let articlesCacheTime = new Map();
 const CACHE_DURATION = 5 * 60 * 1000; // 5分間
 const ARTICLES_CACHE_DURATION = 2 * 60 * 1000; // 記事は2分間（より頻繁に更新される可能性があるため）
 
+// キーセットページネーション: 前ページの応答で受け取った next_cursor（ページ・フィルター条件別）
+let pageCursors = new Map();
+
 // デバウンス用変数
 let filterDebounceTimer = null;
 const DEBOUNCE_DELAY = 300; // 300ms
@@ -204,6 +207,14 @@ async function getTotalArticlesCount(statusFilter = '', flaggedFilter = '', sour
     }
 }
 
+// AI要約の有無（一覧は view=list で本文を持たないので has_ai_summary を見る）
+function hasAISummary(article) {
+    if (article.has_ai_summary !== undefined) {
+        return !!article.has_ai_summary;
+    }
+    return !!(article.ai_summary && article.ai_summary.trim());
+}
+
 // 記事一覧を読み込み（サーバーサイドページネーション）
 async function loadArticles() {
     try {
@@ -269,9 +280,8 @@ async function loadArticlesPageData(page) {
         return cachedData;
     }
     
-    // キャッシュにない場合はAPIから取得
-    const offset = (page - 1) * itemsPerPage;
-    let url = `/api/articles?limit=${itemsPerPage}&offset=${offset}&sort=${sortOrder}`;
+    // キャッシュにない場合はAPIから取得（前ページのカーソルがあれば after、無ければ offset）
+    let url = `/api/articles?view=list&limit=${itemsPerPage}&${pagePositionParam(page, filters)}&sort=${sortOrder}`;
     
     // フィルタリング条件を適用
     if (statusFilter) {
@@ -301,6 +311,8 @@ async function loadArticlesPageData(page) {
         throw new Error(data.error || '記事の読み込みに失敗しました');
     }
     
+    rememberNextCursor(page, filters, data.next_cursor);
+    
     const result = {
         articles: data.articles || [],
         page: page
@@ -356,8 +368,6 @@ async function loadArticlesPage(page, totalCount = null) {
             return;
         }
         
-        const offset = (page - 1) * itemsPerPage;
-        
         // 総件数が未取得の場合は取得（フィルタリング条件付き）
         if (totalCount === null) {
             totalCount = await getTotalArticlesCount(statusFilter, flaggedFilter, sourceFilter, commentFilter);
@@ -368,8 +378,8 @@ async function loadArticlesPage(page, totalCount = null) {
             totalCount = await getTotalArticlesCount(statusFilter, flaggedFilter, sourceFilter, commentFilter);
         }
         
-        // API URLを構築
-        let url = `/api/articles?limit=${itemsPerPage}&offset=${offset}&order=${sortOrder}`;
+        // API URLを構築（前ページのカーソルがあれば after、無ければ offset）
+        let url = `/api/articles?view=list&limit=${itemsPerPage}&${pagePositionParam(page, filters)}&order=${sortOrder}`;
         
         // フィルタリング条件を適用
         if (statusFilter) {
@@ -402,6 +412,7 @@ async function loadArticlesPage(page, totalCount = null) {
         
         articles = data.articles || [];
         currentPage = page;
+        rememberNextCursor(page, filters, data.next_cursor);
         
         // キャッシュに保存
         const cacheData = { articles: articles, page: page };
@@ -793,7 +804,7 @@ function createArticleTableRowElement(article) {
     // AI要約セル
     const summaryCell = document.createElement('td');
     summaryCell.className = 'text-center';
-    if (article.ai_summary && article.ai_summary.trim()) {
+    if (hasAISummary(article)) {
         // AI要約済みの場合
         const summaryIcon = document.createElement('i');
         summaryIcon.className = 'fas fa-robot text-info';
@@ -861,7 +872,7 @@ function createArticleTableRow(article) {
                 </small>
             </td>
             <td class="text-center">
-                ${article.ai_summary && article.ai_summary.trim() ? 
+                ${hasAISummary(article) ? 
                     '<i class="fas fa-robot text-info" title="AI要約済み"></i>' : 
                     '<span class="text-muted">-</span>'
                 }
@@ -2292,10 +2303,28 @@ function setArticlesCache(cacheKey, data) {
     }
 }
 
+// キーセットページネーション: ページの取得位置（カーソルが分かっていれば after、無ければ offset）
+// 前後ページへの移動はカーソルで一定コスト、番号指定で飛んだ場合だけ offset になる
+function pagePositionParam(page, filters) {
+    const cursor = page > 1 ? pageCursors.get(generateCacheKey(page, filters)) : null;
+    if (cursor) {
+        return `after=${encodeURIComponent(cursor)}`;
+    }
+    return `offset=${(page - 1) * filters.itemsPerPage}`;
+}
+
+// キーセットページネーション: 応答の next_cursor を次ページ用に記録
+function rememberNextCursor(page, filters, nextCursor) {
+    if (nextCursor) {
+        pageCursors.set(generateCacheKey(page + 1, filters), nextCursor);
+    }
+}
+
 // キャッシング戦略: キャッシュをクリア（データ更新時）
 function clearArticlesCache() {
     articlesCache.clear();
     articlesCacheTime.clear();
+    pageCursors.clear();
     console.log('記事キャッシュをクリア');
 }
 
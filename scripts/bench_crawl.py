@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+クロールパイプラインのスループット計測ツール
+raw/ に保存済みのフィードを RSS に組み直してローカル HTTP サーバーから配信し、
+記事ページは合成 HTML を返す（遅延・エラーを注入可能）。
+crawl.run_crawl() をローカル Supabase 代替（local_supabase.py）に対して実行し、
+items/sec・ステージ別 p50/p95・ピーク RSS を表示する。
+--json で結果を保存し、--baseline で前回結果と比較できる。
+
+例:
+    python scripts/bench_crawl.py --raw raw/2025-11-14 --latency 50 --error-rate 0.02
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import tempfile
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+# クロール側のキャッシュ・保存先は計測結果を汚さないよう一時ディレクトリに向ける
+# （crawl / fetcher / extraction_cache は import 時に環境変数を読むので先に設定する）
+_TMP = tempfile.mkdtemp(prefix="cfrp_bench_")
+os.environ.setdefault("FEED_CACHE_PATH", os.path.join(_TMP, "feed_validators.json"))
+os.environ.setdefault("FEED_SCHEDULE_PATH", os.path.join(_TMP, "feed_schedule.json"))
+os.environ.setdefault("FEED_MARKS_PATH", os.path.join(_TMP, "feed_marks.json"))
+os.environ.setdefault("EXTRACT_CACHE_PATH", os.path.join(_TMP, "extract_cache.sqlite3"))
+# ホスト別レート制限は既定で外す（CRAWL_HOST_RATE を指定すればその値で計測）
+os.environ.setdefault("CRAWL_HOST_RATE", "0")
+
+import fetcher
+import crawl
+from metrics import metrics
+from raw_archive import iter_feeds, RawArchiveWriter
+from local_supabase import LocalSupabase
+
+# ── フィクスチャサーバー ────────────────────────────────
+class FixtureSite:
+    """1 ソース = 1 ホスト（ポート）として、フィードと記事ページを配信する"""
+
+    def __init__(self, index: int, name: str, feeds: list[list[dict]], args, rng: random.Random):
+        self.index = index
+        self.name  = name
+        self.feeds = feeds
+        self.args  = args
+        self.rng   = rng
+        self.rng_lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self.server.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def feed_urls(self) -> list[str]:
+        return [f"{self.base}/feed/{i}.xml" for i in range(len(self.feeds))]
+
+    def _inject(self) -> bool:
+        """遅延を入れ、エラーを返すべきなら True"""
+        with self.rng_lock:
+            delay = max(0.0, self.args.latency + self.rng.uniform(-self.args.jitter, self.args.jitter))
+            fail  = self.rng.random() < self.args.error_rate
+        time.sleep(delay / 1000)
+        return fail
+
+    def render_feed(self, feed_no: int) -> bytes:
+        items = []
+        for i, e in enumerate(self.feeds[feed_no]):
+            desc = ""
+            if self.args.feed_bodies and e.get("summary"):
+                desc = f"<description>{escape(e['summary'])}</description>"
+            items.append(
+                "<item>"
+                f"<title>{escape(e.get('title') or '')}</title>"
+                f"<link>{self.base}/article/{feed_no}/{i}</link>"
+                f"<guid>{self.base}/article/{feed_no}/{i}</guid>"
+                f"<pubDate>{escape(e.get('published') or e.get('updated') or '')}</pubDate>"
+                f"{desc}</item>"
+            )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>{escape(self.name)}</title><link>{self.base}/</link>"
+            + "".join(items) + "</channel></rss>"
+        ).encode("utf-8")
+
+    def render_article(self, feed_no: int, item_no: int) -> bytes:
+        e = self.feeds[feed_no][item_no]
+        title = escape(e.get("title") or "")
+        seed  = escape(e.get("summary") or e.get("title") or "")
+        paras = "".join(f"<p>{seed} ({n})</p>" for n in range(self.args.paragraphs))
+        return (
+            "<!DOCTYPE html><html><head><title>" + title + "</title>"
+            "<script>var tracking = 1;</script></head><body>"
+            "<nav><a href='/'>Home</a><a href='/news'>News</a></nav>"
+            f"<article><h1>{title}</h1>{paras}</article>"
+            "<footer>© fixture</footer></body></html>"
+        ).encode("utf-8")
+
+    def _handler_class(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                parts = self.path.strip("/").split("/")
+                try:
+                    if parts[0] == "feed":
+                        body, ctype = site.render_feed(int(parts[1].split(".")[0])), "application/rss+xml"
+                    elif parts[0] == "article":
+                        body, ctype = site.render_article(int(parts[1]), int(parts[2])), "text/html; charset=utf-8"
+                    else:
+                        raise IndexError
+                except (IndexError, ValueError):
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                if site._inject():
+                    self.send_response(site.args.error_status)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+# ── ステージ計測 ────────────────────────────────────────
+stage_times: dict[str, list[float]] = {}
+
+def _timed(stage: str, fn):
+    samples = stage_times.setdefault(stage, [])
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - t0)
+    return wrapper
+
+def instrument():
+    """crawl / fetcher の各ステージ関数を計測用ラッパに差し替える"""
+    fetcher.fetch_and_parse      = _timed("feed_fetch", fetcher.fetch_and_parse)
+    crawl.filter_new_urls        = _timed("dedup_query", crawl.filter_new_urls)
+    crawl.fetch_article_html     = _timed("body_fetch", crawl.fetch_article_html)
+    crawl.ExtractorPool.result   = _timed("extract_wait", crawl.ExtractorPool.result)
+    crawl.insert_new             = _timed("db_insert", crawl.insert_new)
+    crawl.process_feed           = _timed("feed_total", crawl.process_feed)
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[k]
+
+def peak_rss_mb() -> dict:
+    # Linux の ru_maxrss は KB 単位（抽出ワーカーは子プロセス側に計上される）
+    self_kb     = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {"main": round(self_kb / 1024, 1), "workers": round(children_kb / 1024, 1)}
+
+# ── 実行 ────────────────────────────────────────────────
+def load_sites(raw_dir: Path, args, rng: random.Random) -> list[FixtureSite]:
+    by_source: dict[str, list] = {}
+    for meta, entries in iter_feeds(raw_dir):
+        if not entries:
+            continue
+        name = meta.get("source") or meta["slug"]
+        by_source.setdefault(name, []).append(entries[: args.max_items] if args.max_items else entries)
+    return [FixtureSite(i, name, feeds, args, rng) for i, (name, feeds) in enumerate(by_source.items())]
+
+def latest_raw_dir() -> Path:
+    base = Path(__file__).resolve().parent.parent / "raw"
+    days = sorted(p for p in base.iterdir() if p.is_dir())
+    if not days:
+        sys.exit("raw/ に計測用データがありません")
+    return days[-1]
+
+def run(args) -> dict:
+    rng = random.Random(args.seed)
+    raw_dir = Path(args.raw) if args.raw else latest_raw_dir()
+    sites = load_sites(raw_dir, args, rng)
+    sources = [{
+        "id": f"bench-{s.index}",
+        "name": s.name,
+        "domain": s.base,
+        "category": "bench",
+        "urls": s.feed_urls(),
+        "parser": args.parser,
+        "acquisition_mode": "auto",
+    } for s in sites]
+
+    crawl.supabase   = LocalSupabase(seed={"sources": sources})
+    crawl.raw_writer = RawArchiveWriter(Path(_TMP) / "raw")
+    crawl.known_urls.clear()
+    instrument()
+
+    t0 = time.perf_counter()
+    try:
+        crawl.run_crawl()
+    finally:
+        wall = time.perf_counter() - t0
+        for s in sites:
+            s.close()
+
+    added = crawl.log_data.get("articles_added", 0)
+    result = {
+        "raw_dir": str(raw_dir),
+        "sources": len(sites),
+        "feeds": sum(len(s.feeds) for s in sites),
+        "items_found": crawl.log_data.get("articles_found", 0),
+        "items_added": added,
+        "errors": crawl.log_data.get("errors_count", 0),
+        "wall_seconds": round(wall, 3),
+        "items_per_sec": round(added / wall, 2) if wall else 0.0,
+        "db_round_trips": crawl.supabase.stats["round_trips"],
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": {
+            stage: {
+                "count": len(v),
+                "p50_ms": round(percentile(v, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(v, 0.95) * 1000, 2),
+                "total_s": round(sum(v), 3),
+            } for stage, v in stage_times.items()
+        },
+        # crawl 本体の計測（task_logs.details.metrics と同じ内容）
+        "metrics": metrics.snapshot()["stages"],
+        "params": {k: v for k, v in vars(args).items() if k not in ("json", "baseline")},
+    }
+    return result
+
+def report(result: dict, baseline: dict | None):
+    print("\n=== crawl benchmark ===")
+    print(f"raw: {result['raw_dir']}  sources: {result['sources']}  feeds: {result['feeds']}")
+    print(f"items: found {result['items_found']} / added {result['items_added']}  errors: {result['errors']}")
+    print(f"wall: {result['wall_seconds']}s  items/sec: {result['items_per_sec']}  "
+          f"db round trips: {result['db_round_trips']}")
+    print(f"peak RSS: main {result['peak_rss_mb']['main']} MB / workers {result['peak_rss_mb']['workers']} MB")
+    print(f"\n{'stage':<14}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'total s':>10}")
+    for stage, st in result["stages"].items():
+        print(f"{stage:<14}{st['count']:>7}{st['p50_ms']:>10}{st['p95_ms']:>10}{st['total_s']:>10}")
+    if baseline:
+        base = baseline.get("items_per_sec") or 0
+        diff = (result["items_per_sec"] - base) / base * 100 if base else 0
+        print(f"\nbaseline items/sec: {base}  ->  {result['items_per_sec']} ({diff:+.1f}%)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="クロールパイプラインのベンチマーク")
+    parser.add_argument("--raw", help="フィクスチャに使う raw/<date>（既定: 最新日）")
+    parser.add_argument("--latency", type=float, default=20, help="応答遅延 ms（既定: 20）")
+    parser.add_argument("--jitter", type=float, default=10, help="遅延の揺らぎ ±ms（既定: 10）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="エラー応答の割合 0..1")
+    parser.add_argument("--error-status", type=int, default=500, help="注入するエラーの HTTP ステータス")
+    parser.add_argument("--paragraphs", type=int, default=30, help="合成記事ページの段落数")
+    parser.add_argument("--max-items", type=int, default=0, help="フィードあたりのエントリ上限（0 = 全件）")
+    parser.add_argument("--feed-bodies", action="store_true",
+                        help="フィードに本文（description）を含める（記事ページ取得を省く経路の計測）")
+    parser.add_argument("--parser", default="rss", help="フィードのパーサ（fetcher.PARSERS のキー、既定: rss）")
+    parser.add_argument("--seed", type=int, default=1, help="遅延・エラー注入の乱数シード")
+    parser.add_argument("--json", help="結果を JSON で保存するパス")
+    parser.add_argument("--baseline", help="比較対象の結果 JSON")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8")) if args.baseline else None
+    result = run(args)
+    report(result, baseline)
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
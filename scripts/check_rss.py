@@ -4,14 +4,14 @@ URLを指定してRSSフィードの存在を確認する簡易ツール
 手動で新しいサイトを調査する際に使用
 """
 import sys
-import requests
+from politeness import polite_session
 from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
 import feedparser
 
 def find_rss_feeds(url):
     """指定されたURLからRSSフィードを検出"""
-    session = requests.Session()
+    session = polite_session()
     session.headers.update({
         'User-Agent': 'Mozilla/5.0 (compatible; RSSChecker/1.0)'
     })
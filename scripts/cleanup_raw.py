@@ -2,12 +2,15 @@
 """
 raw フォルダの古いデータを自動削除するスクリプト
 デフォルトで30日以上前のデータを削除
+--compact を付けると、残す日の旧形式（フィードごとの整形 JSON）を
+圧縮 JSON Lines アーカイブ（raw_archive.py）に 1 ファイルずつ変換する
 """
 import os
 import shutil
 import argparse
 from datetime import datetime, timedelta
 from pathlib import Path
+from raw_archive import compact_legacy
 
 def cleanup_old_raw_data(base_dir: Path, days_to_keep: int = 30, dry_run: bool = False):
     """
@@ -59,6 +62,41 @@ def cleanup_old_raw_data(base_dir: Path, days_to_keep: int = 30, dry_run: bool =
     print(f"{'削除予定' if dry_run else '削除完了'}: {deleted_count} フォルダ, "
           f"合計 {total_size / 1024 / 1024:.1f} MB")
 
+def compact_raw_data(base_dir: Path, dry_run: bool = False):
+    """
+    日付フォルダ内の旧形式 *.json をアーカイブ形式に変換
+    
+    Args:
+        base_dir: rawフォルダのベースディレクトリ
+        dry_run: True の場合、実際には変換せずに対象を表示するのみ
+    """
+    if not base_dir.exists():
+        print(f"エラー: {base_dir} が存在しません")
+        return
+    
+    before_total = after_total = 0
+    for item in sorted(base_dir.iterdir()):
+        if not item.is_dir():
+            continue
+        legacy = list(item.glob("*.json"))
+        if not legacy:
+            continue
+        
+        before = sum(f.stat().st_size for f in item.rglob("*") if f.is_file())
+        if dry_run:
+            print(f"変換予定: {item.name} ({len(legacy)} ファイル, {before / 1024 / 1024:.1f} MB)")
+            continue
+        
+        converted = compact_legacy(item)
+        after = sum(f.stat().st_size for f in item.rglob("*") if f.is_file())
+        before_total += before
+        after_total += after
+        print(f"変換: {item.name} ({converted} ファイル, "
+              f"{before / 1024 / 1024:.1f} MB → {after / 1024 / 1024:.1f} MB)")
+    
+    if not dry_run:
+        print(f"変換完了: 合計 {before_total / 1024 / 1024:.1f} MB → {after_total / 1024 / 1024:.1f} MB")
+
 def main():
     parser = argparse.ArgumentParser(
         description="raw フォルダの古いデータを削除します"
@@ -80,6 +118,11 @@ def main():
         default="raw",
         help="raw フォルダのパス (デフォルト: ./raw)"
     )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="残すフォルダの旧形式 JSON を圧縮アーカイブに変換する"
+    )
     
     args = parser.parse_args()
     
@@ -88,6 +131,8 @@ def main():
     raw_dir = (script_dir.parent / args.path).resolve()
     
     cleanup_old_raw_data(raw_dir, args.days, args.dry_run)
+    if args.compact:
+        compact_raw_data(raw_dir, args.dry_run)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
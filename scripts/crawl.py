@@ -1,185 +1,451 @@
 #!/usr/bin/env python3
-import os, json, datetime, pathlib, requests, trafilatura
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from readability import Document
+import os, json, datetime, pathlib, argparse
 from supabase import create_client, Client
 from dateutil import parser as dtparser
-from fetcher import fetch_and_parse, slug, DEFAULT_CFG
+from fetcher import (fetch_many, slug, DEFAULT_CFG, ValidatorCache, HighWaterMarks, get_session, session_stats,
+                     close_sessions, read_limited, pop_rejection, ResponseRejected)
+from extractor import ExtractorPool, EXTRACTOR_ID
+from raw_archive import RawArchiveWriter, write_legacy_json, iter_feeds, RAW_FORMAT
+from local_supabase import LocalSupabase
+from metrics import metrics
+from politeness import limiter
+from scheduler import FeedScheduler
 import pytz
 import time
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.timezone_utils import safe_date_parse, now_jst_naive_iso
+from utils.timezone_utils import safe_date_parse, now_jst_naive_iso, now_jst_iso
+from utils.extraction_cache import ExtractionCache, hash_html
+from utils.log import get_logger
 
-# ── Supabase ─────────────────────────────────────────────
-supabase: Client = create_client(os.getenv("SUPABASE_URL"),
-                                 os.getenv("SUPABASE_KEY"))
+log = get_logger("crawl")
+
+# ── Supabase（main() で初期化） ─────────────────────────
+# 本文抽出ワーカー（spawn）がこのモジュールを import しても
+# クロールが走らないよう、副作用のある処理はすべて main() に置く
+supabase: Client | None = None
 
 # ── 保存ディレクトリ ───────────────────────────────────
 today   = datetime.date.today().isoformat()
 RAW_DIR = pathlib.Path("raw") / today
-RAW_DIR.mkdir(parents=True, exist_ok=True)
 
-def save_raw(name: str, data):
-    (RAW_DIR / f"{name}.json").write_text(
-        json.dumps(data, ensure_ascii=False, indent=2, default=str),
-        encoding="utf-8"
-    )
+raw_writer = RawArchiveWriter(RAW_DIR)
+
+def save_raw(src: dict, feed_url: str, data):
+    """フィード取得結果を raw/<date>/ に保存（既定は圧縮 JSON Lines アーカイブ）"""
+    if RAW_FORMAT == "json":
+        write_legacy_json(RAW_DIR, f'{src["name"]}-{slug(feed_url)}', data)
+    else:
+        raw_writer.append(src, feed_url, slug(feed_url), data)
 
 # 共通ユーティリティ関数を使用
 def safe_date(txt):
     """安全な日付パース（日本時間）- 共通ユーティリティ関数を使用"""
     return safe_date_parse(txt)
 
-def upsert(row: dict):
+# ── 重複チェック（バッチ）と一括挿入 ────────────────────
+DEDUP_CHUNK = 100       # in.(...) 1 回あたりの URL 数（URL 長の上限対策）
+known_urls: set = set() # 今回の実行で既存と判明した / 挿入済みの URL
+
+def filter_new_urls(urls) -> set:
+    """urls のうち articles に未登録のものを返す（in.(...) でまとめて問い合わせ）"""
+    pending = [u for u in dict.fromkeys(urls) if u and u not in known_urls]
+    for i in range(0, len(pending), DEDUP_CHUNK):
+        chunk = pending[i:i + DEDUP_CHUNK]
+        with metrics.timer("db_select"):
+            res = supabase.table("articles").select("url").in_("url", chunk).execute()
+        known_urls.update(r["url"] for r in (res.data or []))
+    return {u for u in pending if u not in known_urls}
+
+def _record_insert_error(url, err):
+    log_data["errors_count"] += 1
+    log_data["details"]["errors"].append({"url": url, "error": str(err)})
+    log.error("insert failed", url=url, error=str(err))
+
+def insert_new(rows: list[dict]) -> int:
+    """filter_new_urls で絞り込み済みの行を一括挿入し、挿入に失敗した行数を返す"""
+    new_rows, batch_urls = [], set()
+    for r in rows:
+        if r["url"] and r["url"] not in known_urls and r["url"] not in batch_urls:
+            batch_urls.add(r["url"])
+            new_rows.append(r)
+    if not new_rows:
+        return 0
+
     try:
-        # まず既存記事をチェック
-        existing = supabase.table("articles").select("id").eq("url", row["url"]).execute()
-        
-        if existing.data:
-            # 既存記事があれば何もしない
-            print("SKIP (existing):", row["url"])
-            return
-        else:
-            # 新規記事として挿入
-            res = supabase.table("articles").insert(row).execute()
-            err = getattr(res, "error", None) or (res.get("error") if isinstance(res, dict) else None)
-            print("INSERT", "ERROR:" if err else "OK:", err or row["url"])
-            
-            # ログ記録用のカウント
-            if not err:
-                log_data["articles_added"] += 1
-            else:
-                log_data["errors_count"] += 1
-                log_data["details"]["errors"].append({"url": row["url"], "error": str(err)})
-                
-    except Exception as e:
-        log_data["errors_count"] += 1
-        log_data["details"]["errors"].append({"url": row["url"], "error": str(e)})
-        print("UPSERT ERROR:", str(e))
+        with metrics.timer("db_insert"):
+            res = supabase.table("articles").insert(new_rows).execute()
+        err = getattr(res, "error", None) or (res.get("error") if isinstance(res, dict) else None)
+        if err:
+            raise RuntimeError(err)
+    except Exception:
+        # 一括挿入に失敗したら 1 件ずつ入れ直してエラー行を特定
+        failed = 0
+        for r in new_rows:
+            try:
+                with metrics.timer("db_insert"):
+                    supabase.table("articles").insert(r).execute()
+            except Exception as e:
+                _record_insert_error(r["url"], e)
+                failed += 1
+                continue
+            known_urls.add(r["url"])
+            log_data["articles_added"] += 1
+            log.debug("inserted", url=r["url"])
+        return failed
+
+    known_urls.update(batch_urls)
+    log_data["articles_added"] += len(new_rows)
+    log.info("articles inserted", count=len(new_rows))
+    for r in new_rows:
+        log.debug("inserted", url=r["url"])
+    return 0
 
 
 # ── HTML 本文抽出ユーティリティ ────────────────────────
-UA_HEADERS = {"User-Agent": DEFAULT_CFG["ua"]}
-retry_cfg  = Retry(total=3, backoff_factor=1,
-                   status_forcelist=[429, 502, 503, 504])
-session = requests.Session()
-session.headers.update(UA_HEADERS)
-session.mount("https://", HTTPAdapter(max_retries=retry_cfg))
-session.mount("http://",  HTTPAdapter(max_retries=retry_cfg))
-
-def extract_html_body(html: str) -> str | None:
-    """本文テキストを抽出（Trafilatura → Readability フォールバック）"""
-    text = trafilatura.extract(html, include_comments=False, include_tables=False)
-    if text and len(text.split()) > 50:
-        return text
-    # fallback
+# フィード取得と同じプール済み Session を使い、同一ホストへの接続を再利用する
+session = get_session(DEFAULT_CFG)
+
+# 抽出結果キャッシュ。挿入失敗で再処理するフィードやリプレイでの再取得/再抽出を省く
+# （Actions では crawl.yml が EXTRACT_CACHE_PATH を actions/cache で実行間に引き継ぐ）
+extraction_cache = ExtractionCache()
+
+ARTICLE_MAX_BYTES = int(os.getenv("ARTICLE_MAX_BYTES", str(5 * 1024 * 1024)))  # 記事ページの読み込み上限
+
+def fetch_article_html(url: str) -> bytes | None:
     try:
-        cleaned = trafilatura.extract(Document(html).summary())
-        return cleaned
-    except Exception:
+        with metrics.timer("body_http") as t:
+            with session.get(url, timeout=25, stream=True) as r:
+                r.raise_for_status()
+                html = read_limited(r, ARTICLE_MAX_BYTES)
+            t["bytes"] = len(html)
+        return html
+    except ResponseRejected as e:
+        metrics.add("body_rejected")
+        log.warning("body fetch rejected", url=url, reason=str(e))
         return None
+    except Exception as e:
+        log.warning("body fetch failed", url=url, error=str(e))
+        return None
+
 
-def fetch_article_body(url: str) -> str | None:
+# ── フィード 1 本分の処理（重複除外 → 本文取得 → 一括挿入） ──
+def process_feed(src: dict, feed_url: str, entries, extractor: ExtractorPool,
+                 fetch_bodies: bool = True):
+    log_data["articles_found"] += len(entries)
+
+    # --- 0) 本文取得の前に既存 URL をまとめて除外 ----------------------
     try:
-        r = session.get(url, timeout=25)
-        r.raise_for_status()
-        return extract_html_body(r.text)
-    except Exception as e:
-        print("body fetch failed:", url, "->", e)
+        new_urls = filter_new_urls(e.get("link") or e.get("id") for e in entries)
+    except Exception as ex:
+        log_data["errors_count"] += 1
+        log_data["details"]["errors"].append({"url": feed_url, "error": str(ex)})
+        log.error("dedup query failed", feed_url=feed_url, error=str(ex))
         return None
 
+    rows, pending = [], []
+    for e in entries:
+        url = e.get("link") or e.get("id")
+        if url not in new_urls:
+            log.debug("skip existing", url=url)
+            continue
+        new_urls.discard(url)  # 同一フィード内の重複エントリは 1 回だけ処理
 
-# ── ログ記録用の変数初期化 ────────────────────────────
-start_time = time.time()
-log_data = {
-    "task_name": "Daily Article Crawl",
-    "task_type": "daily_crawl",
-    "sources_processed": 0,
-    "articles_found": 0,
-    "articles_added": 0,
-    "errors_count": 0,
-    "details": {"sources": [], "errors": []}
-}
-
-# ── ソース読み込み（Supabaseから） ────────────────────────
-sources_result = supabase.table("sources").select("*").eq("acquisition_mode", "auto").execute()
-sources = sources_result.data
-
-print(f"自動収集対象: {len(sources)} 件")
-
-# ── メインループ ────────────────────────────────────
-for src in sources:
-    log_data["sources_processed"] += 1
-    # sourcesテーブルのカラムからseed_sources.yml互換の設定を構築
-    cfg = {
-        **DEFAULT_CFG,
-        "ua": src.get("ua") or DEFAULT_CFG["ua"],
-        "http_fallback": src.get("http_fallback", False),
-        "retry": src.get("retry_count", 3),
-        "backoff": src.get("backoff_factor", 1.0),
-        "parser": src.get("parser", "rss")
-    }
-    
-    urls = src.get("urls") or []
-    if not urls:
-        print(f"URL未設定: {src.get('name', src.get('domain'))}")
-        continue
-
-    log_data["details"]["sources"].append(src.get('name', src.get('domain')))
-    
-    for feed_url in urls:
-        entries = fetch_and_parse(feed_url, cfg)
-        save_raw(f'{src["name"]}-{slug(feed_url)}', entries)
+        # --- 1) フィードに本文があるか確認 --------------------------
+        body = None
+        # FeedParserDict でもリプレイ時の素の dict でも動くよう添字アクセスで読む
+        content = e.get("content")
+        if content:
+            body = content[0].get("value")
+        elif e.get("summary_detail", {}).get("type") == "text/html":
+            body = e.get("summary")
+
+        # 日本時間での追加時刻を設定（共通ユーティリティ関数を使用）
+        added_at_jst = now_jst_naive_iso()
         
-        log_data["articles_found"] += len(entries)
-
-        for e in entries:
-            # --- 1) フィードに本文があるか確認 --------------------------
-            body = None
-            if "content" in e and e.content:
-                body = e.content[0].value
-            elif e.get("summary_detail", {}).get("type") == "text/html":
-                body = e.get("summary")
-
-            # --- 2) 無ければページをクロール ----------------------------
-            if not body:
-                link = e.get("link") or e.get("id")
-                body = fetch_article_body(link)
-
-            # 日本時間での追加時刻を設定（共通ユーティリティ関数を使用）
-            added_at_jst = now_jst_naive_iso()
-            
-            upsert({
-                "src_type": src["category"],
-                "source_id": src["id"],  # 外部キー追加
-                "title"   : e.get("title"),
-                "url"     : e.get("link") or e.get("id"),
-                "published_at": safe_date(e.get("published") or e.get("updated")),
-                "body"    : body,
-                "added_at": added_at_jst,
-            })
-
-# ── ログをDBに記録 ────────────────────────────────
-end_time = time.time()
-log_data["duration_seconds"] = int(end_time - start_time)
-log_data["status"] = "failed" if log_data["errors_count"] > 0 else "success"
-
-# detailsをJSON文字列に変換
-log_data["details"] = json.dumps(log_data["details"], ensure_ascii=False)
-
-# task_logsテーブルに記録
-log_result = supabase.table("task_logs").insert(log_data).execute()
-if hasattr(log_result, "error") and log_result.error:
-    print(f"ログ記録エラー: {log_result.error}")
-else:
-    print(f"\n実行ログ記録完了:")
-    print(f"  - 処理ソース数: {log_data['sources_processed']}")
-    print(f"  - 発見記事数: {log_data['articles_found']}")
-    print(f"  - 追加記事数: {log_data['articles_added']}")
-    print(f"  - エラー数: {log_data['errors_count']}")
-    print(f"  - 実行時間: {log_data['duration_seconds']}秒")
-
-print("crawl finished")
+        row = {
+            "src_type": src["category"],
+            "source_id": src["id"],  # 外部キー追加
+            "title"   : e.get("title"),
+            "url"     : url,
+            "published_at": safe_date(e.get("published") or e.get("updated")),
+            "body"    : body,
+            "added_at": added_at_jst,
+        }
+        rows.append(row)
+
+        # --- 2) 無ければページをクロール（新規 URL のみ） ----------------
+        # 抽出はワーカープールに投げ、次の記事の取得と並行して進める
+        if not body:
+            body = extraction_cache.get(url, EXTRACTOR_ID)
+            if body:
+                metrics.add("extract_cache_hit")
+                row["body"] = body
+                continue
+            html = fetch_article_html(url) if fetch_bodies else None
+            if not html:
+                continue
+            html_sha256 = hash_html(html)
+            body = extraction_cache.get_by_hash(html_sha256, EXTRACTOR_ID)
+            if body:
+                metrics.add("extract_cache_hit")
+                row["body"] = body
+                extraction_cache.put(url, html_sha256, body, EXTRACTOR_ID)
+                continue
+            pending.append((row, html_sha256, extractor.submit(html)))
+
+    for row, html_sha256, job in pending:
+        row["body"] = extractor.result(job)
+        extraction_cache.put(row["url"], html_sha256, row["body"], EXTRACTOR_ID)
+
+    # --- 3) 新規分をまとめて一括挿入 ----------------------------------
+    # 挿入できなかった行があれば失敗扱い（None）にして、次回そのフィードを再処理させる
+    if insert_new(rows):
+        return None
+    return len(rows)
+
+def touch_last_collected(source_ids):
+    """新着があったソースの last_collected_at を更新（日本時間）"""
+    now = now_jst_iso()
+    for source_id in source_ids:
+        try:
+            supabase.table("sources").update({"last_collected_at": now}).eq("id", source_id).execute()
+        except Exception as e:
+            log.warning("last_collected_at update failed", source_id=source_id, error=str(e))
+
+
+# ── ログ記録用（main() で中身を設定） ──────────────────
+log_data: dict = {}
+
+def start_log(task_name: str, task_type: str):
+    log_data.clear()
+    log_data.update({
+        "task_name": task_name,
+        "task_type": task_type,
+        "sources_processed": 0,
+        "articles_found": 0,
+        "articles_added": 0,
+        "errors_count": 0,
+        "details": {"sources": [], "errors": []}
+    })
+
+def finish_log(start_time: float, metrics_path: str | None = None):
+    # ── ステージ別計測をログに添付（任意でローカルにも JSON 出力） ──
+    log_data["details"]["metrics"] = metrics.snapshot()
+    if metrics_path:
+        metrics.dump(metrics_path)
+        log.info("計測結果を出力", path=metrics_path)
+
+    # ── ログをDBに記録 ────────────────────────────────
+    end_time = time.time()
+    log_data["duration_seconds"] = int(end_time - start_time)
+    log_data["status"] = "failed" if log_data["errors_count"] > 0 else "success"
+    details = log_data["details"]
+
+    # detailsをJSON文字列に変換
+    log_data["details"] = json.dumps(details, ensure_ascii=False)
+
+    # task_logsテーブルに記録
+    log_result = supabase.table("task_logs").insert(log_data).execute()
+    if hasattr(log_result, "error") and log_result.error:
+        log.error("ログ記録エラー", error=str(log_result.error))
+    else:
+        pool_stats = details.get("http_pool") or {}
+        log.info("実行ログ記録完了",
+                 sources_processed=log_data["sources_processed"],
+                 articles_found=log_data["articles_found"],
+                 articles_added=log_data["articles_added"],
+                 errors_count=log_data["errors_count"],
+                 duration_seconds=log_data["duration_seconds"],
+                 http_requests=pool_stats.get("requests"),
+                 http_connections=pool_stats.get("connections"),
+                 http_reused=pool_stats.get("reused"))
+
+def run_crawl(metrics_path: str | None = None, ignore_schedule: bool = False):
+    """
+    通常の日次クロール：Supabase の auto ソースを取得して記事を追加
+    フィードごとの新着流量から決めた次回予定（scheduler.py）を過ぎたものだけ取得し、
+    各フィードは前回の既読位置（fetcher.HighWaterMarks）より新しいエントリだけを処理する。
+    ignore_schedule=True ならスケジュールも既読位置も無視して全件処理する。
+    """
+    start_time = time.time()
+    start_log("Daily Article Crawl", "daily_crawl")
+    metrics.reset()
+
+    # ── ソース読み込み（Supabaseから） ────────────────────────
+    sources_result = supabase.table("sources").select("*").eq("acquisition_mode", "auto").execute()
+    sources = sources_result.data
+
+    log.info("自動収集対象", sources=len(sources))
+
+    # ── フィード取得ジョブの組み立て ──────────────────────
+    scheduler = FeedScheduler()
+    jobs = []
+    for src in sources:
+        log_data["sources_processed"] += 1
+        # sourcesテーブルのカラムからseed_sources.yml互換の設定を構築
+        cfg = {
+            **DEFAULT_CFG,
+            "ua": src.get("ua") or DEFAULT_CFG["ua"],
+            "http_fallback": src.get("http_fallback", False),
+            "retry": src.get("retry_count", 3),
+            "backoff": src.get("backoff_factor", 1.0),
+            "parser": src.get("parser", "rss"),
+            "max_bytes": src.get("max_bytes") or DEFAULT_CFG["max_bytes"],
+        }
+
+        urls = src.get("urls") or []
+        if not urls:
+            log.warning("URL未設定", source=src.get('name', src.get('domain')))
+            continue
+
+        log_data["details"]["sources"].append(src.get('name', src.get('domain')))
+
+        for feed_url in urls:
+            if ignore_schedule or scheduler.is_due(feed_url):
+                jobs.append((src, feed_url, cfg))
+
+    log.info("取得対象フィード", feeds=len(jobs), skipped_not_due=scheduler.stats['skipped'])
+
+    # ── メインループ ────────────────────────────────────
+    # フィード取得は並列（fetcher.fetch_many）、本文抽出はプロセスプール、
+    # upsert は完了順に逐次処理
+    # 前回から変化の無いフィード（304 / 本文ハッシュ一致）や新着の無いフィードは entries が空で返る
+    feed_cache = ValidatorCache()
+    marks = HighWaterMarks()
+    collected = set()
+    with ExtractorPool() as extractor:
+        for src, feed_url, entries in fetch_many(jobs, cache=feed_cache,
+                                                 label=lambda s: s.get("name"),
+                                                 marks=None if ignore_schedule else marks):
+            if entries is None:
+                scheduler.record_failure(feed_url)
+                # サイズ超過などで読まなかったフィードはソースのエラーとして残す
+                reason = pop_rejection(feed_url)
+                if reason:
+                    log_data["errors_count"] += 1
+                    log_data["details"]["errors"].append(
+                        {"source": src.get("name"), "url": feed_url, "error": reason})
+                continue
+            if not entries:
+                feed_cache.commit(feed_url)
+                scheduler.record(feed_url, 0)
+                continue
+            save_raw(src, feed_url, entries)
+            with metrics.scope(src.get("name")):
+                new_count = process_feed(src, feed_url, entries, extractor)
+            if new_count is None:
+                # バリデータを確定しないので、次回は 304 / ハッシュ一致で飛ばされず再処理される
+                feed_cache.discard(feed_url)
+                scheduler.record_failure(feed_url)
+                continue
+            feed_cache.commit(feed_url)
+            scheduler.record(feed_url, new_count)
+            marks.record(feed_url, entries)
+            if new_count:
+                collected.add(src["id"])
+
+    touch_last_collected(collected)
+
+    # 全ソースの処理が終わってから、処理に成功したフィードのバリデータだけを保存
+    # （途中で落ちた場合も次回再取得）
+    feed_cache.save()
+    scheduler.save()
+    marks.save()
+    log_data["details"]["feed_cache"] = feed_cache.stats
+    log_data["details"]["schedule"] = scheduler.stats
+    log_data["details"]["high_water"] = marks.stats
+    log_data["details"]["http_pool"] = session_stats()
+    log_data["details"]["rate_limit"] = limiter.stats
+    log_data["details"]["extractor"] = extractor.stats
+    log_data["details"]["extraction_cache"] = extraction_cache.stats
+    extraction_cache.close()
+    close_sessions()
+
+    finish_log(start_time, metrics_path)
+
+def _replay_source(meta: dict, sources: list[dict]) -> dict:
+    """raw のメタ情報からソース行を組み立てる（旧形式はファイル名の前方一致で推定）"""
+    for src in sources:
+        if meta.get("source_id") and src.get("id") == meta["source_id"]:
+            return src
+        if not meta.get("source") and meta["slug"].startswith(f'{src.get("name")}-'):
+            return src
+    return {
+        "id": meta.get("source_id"),
+        "name": meta.get("source") or meta["slug"],
+        "category": meta.get("category"),
+    }
+
+def run_replay(day_dir: pathlib.Path, fetch_bodies: bool, metrics_path: str | None = None):
+    """raw/<date> に保存済みのエントリを、本文取得・upsert パイプラインに流し直す"""
+    start_time = time.time()
+    start_log(f"Replay Article Crawl ({day_dir.name})", "replay_crawl")
+    metrics.reset()
+
+    # 旧形式のソース推定とカテゴリ補完のため、取れればソース一覧を使う
+    try:
+        sources = supabase.table("sources").select("*").execute().data or []
+    except Exception:
+        sources = []
+
+    log.info("リプレイ対象", path=str(day_dir))
+    with ExtractorPool() as extractor:
+        for meta, entries in iter_feeds(day_dir):
+            src = _replay_source(meta, sources)
+            log_data["sources_processed"] += 1
+            log_data["details"]["sources"].append(src.get("name"))
+            with metrics.scope(src.get("name")):
+                process_feed(src, meta.get("feed_url") or meta["slug"], entries, extractor,
+                             fetch_bodies=fetch_bodies)
+
+    log_data["details"]["extractor"] = extractor.stats
+    log_data["details"]["extraction_cache"] = extraction_cache.stats
+    if isinstance(supabase, LocalSupabase):
+        log_data["details"]["local_db"] = supabase.stats
+    extraction_cache.close()
+    close_sessions()
+
+    finish_log(start_time, metrics_path)
+
+def main(argv=None):
+    global supabase
+
+    parser = argparse.ArgumentParser(description="CFRP 記事クローラー")
+    parser.add_argument("--replay", metavar="RAW_DIR",
+                        help="raw/<date> の保存済みエントリを使って本文取得・upsert を再実行する")
+    parser.add_argument("--db", choices=["supabase", "local"],
+                        help="書き込み先（既定: 通常は supabase、--replay 時は local）")
+    parser.add_argument("--local-db-path", metavar="PATH",
+                        help="--db local の結果を JSON で書き出すパス")
+    parser.add_argument("--offline", action="store_true",
+                        help="--replay 時に記事ページを取得しない（フィード内本文と抽出キャッシュのみ）")
+    parser.add_argument("--all", action="store_true",
+                        help="次回予定と既読位置を無視してすべてのフィードを全件処理する")
+    parser.add_argument("--metrics-json", metavar="PATH",
+                        help="ステージ別・ソース別の計測結果を JSON でも書き出すパス")
+    args = parser.parse_args(argv)
+
+    # ── Supabase 初期化 ───────────────────────────────────
+    db = args.db or ("local" if args.replay else "supabase")
+    if db == "local":
+        supabase = LocalSupabase(path=args.local_db_path)
+    else:
+        supabase = create_client(os.getenv("SUPABASE_URL"),
+                                 os.getenv("SUPABASE_KEY"))
+
+    if args.replay:
+        run_replay(pathlib.Path(args.replay), fetch_bodies=not args.offline,
+                   metrics_path=args.metrics_json)
+    else:
+        run_crawl(metrics_path=args.metrics_json, ignore_schedule=args.all)
+
+    if isinstance(supabase, LocalSupabase):
+        supabase.save()
+
+    log.info("crawl finished")
+
+
+if __name__ == "__main__":
+    main()
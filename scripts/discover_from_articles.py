@@ -16,7 +16,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.timezone_utils import now_jst_naive_iso
 from typing import List, Dict, Set, Optional
 from supabase import create_client, Client
-import requests
+from politeness import polite_session
 from bs4 import BeautifulSoup
 import feedparser
 
@@ -28,7 +28,7 @@ supabase: Client = create_client(
 
 class ArticleSourceDiscoverer:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = polite_session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (compatible; CFRPSourceDiscoverer/1.0)'
         })
@@ -3,17 +3,13 @@
 GPT提供の情報源カテゴリに基づく自動探索
 新しく追加されたカテゴリの類似情報源を発見
 """
-import os
-import json
-import requests
+from politeness import polite_session
 from datetime import datetime
 from typing import List, Dict
-from bs4 import BeautifulSoup
-import time
-import random
 
 class GPTCategoryDiscoverer:
     def __init__(self):
+        self.session = polite_session()
         self.categories = {
             # 日本の炭素繊維・複合材料メーカー
             'japanese_carbon_fiber': {
@@ -105,8 +101,6 @@ class GPTCategoryDiscoverer:
             sources = self.simulate_search(search_term, category_data['keywords'])
             category_sources.extend(sources)
             
-            # レート制限
-            time.sleep(random.uniform(1, 3))
         
         return category_sources
     
@@ -252,7 +246,7 @@ class GPTCategoryDiscoverer:
         for path in common_rss_paths:
             try:
                 url = f"https://{domain}{path}"
-                response = requests.head(url, timeout=10)
+                response = self.session.head(url, timeout=10)
                 if response.status_code == 200:
                     return url
             except:
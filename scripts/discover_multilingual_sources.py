@@ -6,7 +6,7 @@
 import os
 import json
 import time
-import requests
+from politeness import polite_session, limiter
 import feedparser
 from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
@@ -28,10 +28,12 @@ class MultilingualSourceDiscoverer:
     def __init__(self):
         self.google_api_key = os.getenv("GOOGLE_API_KEY")
         self.google_cx = os.getenv("GOOGLE_CUSTOM_SEARCH_ENGINE_ID")
-        self.session = requests.Session()
+        self.session = polite_session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (compatible; MultilingualCompositeDiscoverer/1.0)'
         })
+        # Google Custom Search API はクエリ間隔を 2 秒以上空ける（旧: 検索ごとの time.sleep(2)）
+        limiter.set_rate("www.googleapis.com", 0.5, 1)
         
         # 言語別キーワード定義
         self.multilingual_keywords = {
@@ -134,7 +136,6 @@ class MultilingualSourceDiscoverer:
             print(f"\n検索中 ({language}): {query}")
             results = self.search_google(query, num_results=5)
             all_results.extend(results)
-            time.sleep(2)  # API制限対策
             
         return all_results
     
@@ -5,8 +5,7 @@ Google Custom Search APIとRSSフィード検出を使用
 """
 import os
 import json
-import time
-import requests
+from politeness import polite_session
 import feedparser
 from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
@@ -24,7 +23,7 @@ class SourceDiscoverer:
     def __init__(self):
         self.google_api_key = os.getenv("GOOGLE_API_KEY")
         self.google_cx = os.getenv("GOOGLE_CUSTOM_SEARCH_ENGINE_ID")
-        self.session = requests.Session()
+        self.session = polite_session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (compatible; CFRPSourceDiscoverer/1.0)'
         })
@@ -178,7 +177,7 @@ class SourceDiscoverer:
                         discovered_sources.append(source)
                         print(f"  → 新規フィード発見: {feed_url}")
                 
-                time.sleep(1)  # API制限対策
+                # レート制限はホスト単位で politeness.limiter が行う
         
         return discovered_sources
     
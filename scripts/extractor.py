@@ -0,0 +1,134 @@
+# scripts/extractor.py
+"""
+記事本文抽出モジュール
+生 HTML（bytes / str）から本文テキストを取り出す処理と、
+それを複数プロセスで並列に回すためのワーカープールをまとめてある。
+Trafilatura / Readability は CPU バウンドなので、ネットワークを並列化した後は
+ここがクロール時間の大半を占める。
+"""
+
+import os
+import sys
+import time
+import multiprocessing
+import trafilatura
+from readability import Document
+from metrics import metrics
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.log import get_logger
+
+log = get_logger("extractor")
+
+# ── 設定（環境変数で上書き可） ───────────────────────────
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(os.cpu_count() or 1)))  # 0 ならインライン実行
+EXTRACT_TIMEOUT = float(os.getenv("EXTRACT_TIMEOUT", "30"))                     # 1 文書あたりの秒数
+
+# 抽出キャッシュ（utils/extraction_cache.py）用の抽出器 ID。抽出ロジックを変えたら末尾を上げる
+EXTRACTOR_ID = f"trafilatura-{getattr(trafilatura, '__version__', '?')}+readability/1"
+
+# ── 本文抽出（Trafilatura → Readability フォールバック） ──
+def extract_html_body(html: bytes | str) -> str | None:
+    """本文テキストを抽出（Trafilatura → Readability フォールバック）"""
+    text = trafilatura.extract(html, include_comments=False, include_tables=False)
+    if text and len(text.split()) > 50:
+        return text
+    # fallback
+    try:
+        cleaned = trafilatura.extract(Document(html).summary())
+        return cleaned
+    except Exception:
+        return None
+
+def _extract_safe(html: bytes | str) -> tuple[str | None, float]:
+    # ワーカー内の例外はプール全体に波及させず None として返す
+    # 抽出にかかった時間も一緒に返し、親プロセス側の計測に載せる
+    t0 = time.perf_counter()
+    try:
+        text = extract_html_body(html)
+    except Exception as e:
+        log.warning("extract failed", error=str(e))
+        text = None
+    return text, time.perf_counter() - t0
+
+# ── プロセスプール ──────────────────────────────────────
+class ExtractJob:
+    """ExtractorPool.submit が返すハンドル"""
+    __slots__ = ("html", "async_result", "generation")
+
+    def __init__(self, html, async_result, generation):
+        self.html         = html
+        self.async_result = async_result
+        self.generation   = generation
+
+class ExtractorPool:
+    """
+    生 HTML を受け取り本文テキストを返すプロセスプール。
+    submit() で投入しておき、result() で受け取る（フェッチと抽出が重なる）。
+    result() が timeout を超えた文書は None とし、詰まったワーカーごとプールを作り直す。
+    作り直した時点で未回収のジョブは、まとめて新しいプールへ再投入する（並列のまま回収できる）。
+    """
+
+    def __init__(self, workers: int = EXTRACT_WORKERS, timeout: float = EXTRACT_TIMEOUT):
+        self.workers    = max(0, workers)
+        self.timeout    = timeout
+        self.generation = 0
+        self.stats      = {"submitted": 0, "timeouts": 0, "restarts": 0, "resubmitted": 0}
+        self._pool      = self._new_pool()
+        self._pending   = set()   # 投入済みで result() 未回収のジョブ
+
+    def _new_pool(self):
+        if self.workers == 0:
+            return None
+        return multiprocessing.get_context("spawn").Pool(self.workers)
+
+    def _restart(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+        self.generation += 1
+        self.stats["restarts"] += 1
+        self._pool = self._new_pool()
+        # 古いプールで処理中・待機中だったジョブを 1 件ずつではなく全部先に投入し直す
+        for job in self._pending:
+            job.async_result = self._pool.apply_async(_extract_safe, (job.html,))
+            job.generation   = self.generation
+        self.stats["resubmitted"] += len(self._pending)
+
+    def submit(self, html: bytes | str) -> ExtractJob:
+        self.stats["submitted"] += 1
+        if self._pool is None:
+            return ExtractJob(html, None, self.generation)
+        job = ExtractJob(html, self._pool.apply_async(_extract_safe, (html,)), self.generation)
+        self._pending.add(job)
+        return job
+
+    def result(self, job: ExtractJob) -> str | None:
+        if self._pool is None:
+            text, seconds = _extract_safe(job.html)
+            metrics.add("extract", seconds=seconds, nbytes=len(job.html))
+            return text
+        self._pending.discard(job)
+        try:
+            with metrics.timer("extract_wait"):
+                text, seconds = job.async_result.get(timeout=self.timeout)
+        except multiprocessing.TimeoutError:
+            self.stats["timeouts"] += 1
+            metrics.add("extract_timeout")
+            log.warning("extract timed out, restarting workers", timeout=self.timeout)
+            self._restart()
+            return None
+        metrics.add("extract", seconds=seconds, nbytes=len(job.html))
+        return text
+
+    def close(self):
+        self._pending.clear()
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
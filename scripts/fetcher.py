@@ -5,10 +5,20 @@ YAML で指定したメタ情報（ua, retry, http_fallback など）を使っ
 どんなソースでも fetch_and_parse() 1 本で取れるようにしてある。
 """
 
-import json, requests, feedparser
+import os, re, sys, json, time, codecs, hashlib, pathlib, datetime, threading, requests, feedparser
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from dateutil import parser as dtparser
+from metrics import metrics
+from politeness import PoliteAdapter, PoliteRetry
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.log import get_logger
+try:
+    from lxml import etree
+except ImportError:  # lxml が無ければ rss_fast は feedparser にフォールバック
+    etree = None
+
+log = get_logger("fetcher")
 
 # ── デフォルト設定 ─────────────────────────────────────
 DEFAULT_CFG = {
@@ -17,35 +27,395 @@ DEFAULT_CFG = {
     "backoff":       1,      # 1→2→4 秒
     "timeout":       30,
     "http_fallback": False,  # https 失敗時に http へ?
-    "parser":        "rss",  # rss / json / (拡張可)
+    "parser":        "rss",  # rss / rss_fast / json / (拡張可)
+    "max_bytes":     int(os.getenv("FEED_MAX_BYTES", str(10 * 1024 * 1024))),  # これを超えるレスポンスは読まない
 }
 
-# ── 内部：requests.Session を作る ───────────────────────
-def _session(cfg: dict) -> requests.Session:
-    r = Retry(
-        total          = cfg.get("retry",   DEFAULT_CFG["retry"]),
-        backoff_factor = cfg.get("backoff", DEFAULT_CFG["backoff"]),
-        status_forcelist=[429, 502, 503, 504],
+# ── 並列フェッチ設定（環境変数で上書き可） ───────────────
+MAX_WORKERS   = int(os.getenv("CRAWL_CONCURRENCY", "8"))   # 全体の同時接続数
+PER_HOST_MAX  = int(os.getenv("CRAWL_PER_HOST", "2"))      # 同一ホストへの同時接続数
+
+# ── 条件付き GET 用バリデータキャッシュ ─────────────────
+FEED_CACHE_PATH = os.getenv("FEED_CACHE_PATH", "cache/feed_validators.json")
+
+# ── フィードごとの既読位置（high-water mark） ────────────
+FEED_MARKS_PATH = os.getenv("FEED_MARKS_PATH", "cache/feed_marks.json")
+MARK_KEYS       = 5                                               # 覚えておく先頭エントリ数
+FULL_SCAN_HOURS = float(os.getenv("FEED_FULL_SCAN_HOURS", "168")) # この間隔で一度は全件処理する
+
+# fetch_text が「前回から変化なし」を表すために返す番兵
+NOT_MODIFIED = object()
+
+# ── レスポンスの読み込み上限 ─────────────────────────────
+READ_CHUNK = 64 * 1024
+# フィードとしては読まない Content-Type（先頭一致）
+REJECT_TYPES = ("image/", "audio/", "video/", "font/", "application/pdf", "application/zip")
+
+class ValidatorCache:
+    """
+    フィード URL ごとに ETag / Last-Modified / 本文ハッシュを保持する永続キャッシュ。
+    次回取得時に If-None-Match / If-Modified-Since を送り、304 またはハッシュ一致なら
+    パースを丸ごと省略できるようにする。並列フェッチから呼ばれるのでロックで保護。
+    取得時の新しいバリデータはいったん保留し、呼び出し側がそのフィードの処理に成功してから
+    commit() で確定する（失敗したフィードは discard() で捨て、次回は変化ありとして再処理する）。
+    """
+
+    def __init__(self, path: str = FEED_CACHE_PATH):
+        self.path = pathlib.Path(path)
+        self._lock = threading.Lock()
+        self.stats = {"not_modified": 0, "same_hash": 0, "changed": 0}
+        self._pending: dict[str, dict] = {}
+        try:
+            self._data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            self._data = {}
+
+    def request_headers(self, url: str) -> dict:
+        with self._lock:
+            ent = self._data.get(url) or {}
+        headers = {}
+        if ent.get("etag"):
+            headers["If-None-Match"] = ent["etag"]
+        if ent.get("last_modified"):
+            headers["If-Modified-Since"] = ent["last_modified"]
+        return headers
+
+    def is_unchanged(self, url: str, resp: requests.Response, digest: str | None = None) -> bool:
+        """
+        レスポンスのバリデータを保留し、前回（確定済み）から変化が無ければ True を返す。
+        ストリーミングで読んだ場合は、読みながら計算した本文の sha256 を digest に渡す。
+        """
+        if resp.status_code == 304:
+            with self._lock:
+                self.stats["not_modified"] += 1
+            return True
+        digest = digest or hashlib.sha256(resp.content).hexdigest()
+        with self._lock:
+            prev = self._data.get(url) or {}
+            self._pending[url] = {
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "sha256": digest,
+            }
+            if prev.get("sha256") == digest:
+                self.stats["same_hash"] += 1
+                return True
+            self.stats["changed"] += 1
+        return False
+
+    def commit(self, url: str):
+        """そのフィードの処理に成功したので保留中のバリデータを確定する"""
+        with self._lock:
+            ent = self._pending.pop(url, None)
+            if ent is not None:
+                self._data[url] = ent
+
+    def discard(self, url: str):
+        """処理に失敗したフィードは保留分を捨て、確定済みの値も消して次回は必ず再処理する"""
+        with self._lock:
+            self._pending.pop(url, None)
+            self._data.pop(url, None)
+
+    def save(self):
+        """確定済みの分だけ書き出す"""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(
+                json.dumps(self._data, ensure_ascii=False, indent=1, sort_keys=True),
+                encoding="utf-8"
+            )
+
+# ── 既読位置（high-water mark） ──────────────────────────
+def entry_key(e) -> str | None:
+    """エントリの識別子（GUID / id → link の順）"""
+    return e.get("id") or e.get("link") or None
+
+def entry_date(e) -> datetime.datetime | None:
+    """エントリの公開日時（UTC, aware）。読めなければ None"""
+    txt = e.get("published") or e.get("updated")
+    if not txt:
+        return None
+    try:
+        dt = dtparser.parse(txt)
+    except (ValueError, OverflowError, TypeError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt.astimezone(datetime.timezone.utc)
+
+class HighWaterMarks:
+    """
+    フィード URL ごとに「前回処理した先頭エントリの GUID/link」と「最新の公開日時」を保持する。
+    多くのフィードは新着を先頭に足すだけなので、既読の GUID に当たった時点で以降を読まずに打ち切る。
+    公開日時での打ち切りは、前回の全件処理で日付の降順だと確認できたフィードに限る
+    （arXiv の検索結果のように関連度順のフィードでは日付で止めない）。
+    途中に古い記事が差し込まれるフィードもあるため、FULL_SCAN_HOURS ごとに一度は全件処理する。
+    """
+
+    def __init__(self, path: str = FEED_MARKS_PATH):
+        self.path     = pathlib.Path(path)
+        self._lock    = threading.Lock()
+        self._partial = set()   # 今回、既読位置で打ち切る対象にした URL
+        self.stats    = {"stopped": 0, "entries_skipped": 0, "full_scans": 0}
+        try:
+            self._data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            self._data = {}
+
+    def get(self, url: str, now: float | None = None) -> dict | None:
+        """打ち切りに使う既読位置。未記録か全件処理の時期なら None"""
+        now = now or time.time()
+        with self._lock:
+            mark = self._data.get(url)
+            if not mark or not mark.get("keys") or now - mark.get("full_scan_at", 0) >= FULL_SCAN_HOURS * 3600:
+                return None
+            self._partial.add(url)
+            return dict(mark)
+
+    def take_new(self, url: str, entries, mark: dict | None):
+        """
+        entries（リストでもイテレータでもよい）を先頭から読み、既読位置に達したら打ち切る。
+        パーサがイテレータを返す場合は、打ち切った以降のパース自体も行われない。
+        """
+        if not mark:
+            yield from entries
+            return
+        known = set(mark.get("keys") or [])
+        newest = None
+        if mark.get("sorted") and mark.get("published"):
+            newest = datetime.datetime.fromisoformat(mark["published"])
+        for i, e in enumerate(entries):
+            dt = entry_date(e) if newest else None
+            if entry_key(e) in known or (dt and dt < newest):
+                with self._lock:
+                    self.stats["stopped"] += 1
+                    # イテレータの残りを数えると打ち切りの意味が無くなるので、件数はリストのときだけ
+                    if isinstance(entries, list):
+                        self.stats["entries_skipped"] += len(entries) - i
+                return
+            yield e
+
+    def record(self, url: str, entries: list, now: float | None = None):
+        """処理したエントリで既読位置を進める（処理に成功したときだけ呼ぶ）"""
+        if not entries:
+            return
+        now = now or time.time()
+        with self._lock:
+            full = url not in self._partial
+            prev = self._data.get(url) or {}
+            keys = [k for k in (entry_key(e) for e in entries[:MARK_KEYS]) if k]
+            keys += [k for k in prev.get("keys", []) if k not in keys]
+            dates = [entry_date(e) for e in entries]
+            known = [d for d in dates if d]
+            published = max(known).isoformat() if known else None
+            if prev.get("published") and (not published or prev["published"] > published):
+                published = prev["published"]
+            in_order = all(a >= b for a, b in zip(known, known[1:]))
+            mark = {
+                "keys":         keys[:MARK_KEYS],
+                "published":    published,
+                "sorted":       in_order if full else prev.get("sorted", False) and in_order,
+                "full_scan_at": now if full else prev.get("full_scan_at", 0),
+            }
+            if full:
+                self.stats["full_scans"] += 1
+            self._data[url] = mark
+
+    def save(self):
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(
+                json.dumps(self._data, ensure_ascii=False, indent=1, sort_keys=True),
+                encoding="utf-8"
+            )
+
+# ── requests.Session をプールして使い回す ─────────────────
+# (ua, retry, backoff) が同じなら同じ Session を返し、TCP/TLS の keep-alive を
+# フィード間・フィード取得と本文取得の間で共有する
+# アダプタは PoliteAdapter なので、同一ホストへのリクエストはレート制限される
+POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "32"))  # ホスト別プールの保持数
+POOL_MAXSIZE     = int(os.getenv("HTTP_POOL_MAXSIZE", "8"))       # 1 ホストあたりの接続数
+
+_sessions: dict[tuple, requests.Session] = {}
+_sessions_guard = threading.Lock()
+
+# HTTP_POOL_CONNECTIONS を超えて LRU から追い出された（閉じた）プールの累計。
+# session_stats() は生きているプールしか見られないので、閉じる直前にここへ足しておく
+_disposed = {"requests": 0, "connections": 0}
+_disposed_lock = threading.Lock()
+
+def _count_disposed_pools(adapter: requests.adapters.HTTPAdapter):
+    pools = adapter.poolmanager.pools
+    dispose = pools.dispose_func
+
+    def count_and_dispose(pool):
+        with _disposed_lock:
+            _disposed["requests"]    += pool.num_requests
+            _disposed["connections"] += pool.num_connections
+        if dispose:
+            dispose(pool)
+
+    pools.dispose_func = count_and_dispose
+
+def get_session(cfg: dict) -> requests.Session:
+    key = (
+        cfg.get("ua",      DEFAULT_CFG["ua"]),
+        cfg.get("retry",   DEFAULT_CFG["retry"]),
+        cfg.get("backoff", DEFAULT_CFG["backoff"]),
     )
-    s = requests.Session()
-    s.headers.update({"User-Agent": cfg.get("ua", DEFAULT_CFG["ua"])})
-    s.mount("https://", HTTPAdapter(max_retries=r))
-    s.mount("http://",  HTTPAdapter(max_retries=r))
-    return s
+    with _sessions_guard:
+        s = _sessions.get(key)
+        if s is not None:
+            return s
+        ua, retry, backoff = key
+        # 429 / 503 の自動リトライでも Retry-After をホスト単位のリミッタに反映する
+        r = PoliteRetry(
+            total          = retry,
+            backoff_factor = backoff,
+            status_forcelist=[429, 502, 503, 504],
+        )
+        s = requests.Session()
+        s.headers.update({"User-Agent": ua})
+        adapter = PoliteAdapter(max_retries=r,
+                                pool_connections=POOL_CONNECTIONS,
+                                pool_maxsize=POOL_MAXSIZE)
+        _count_disposed_pools(adapter)
+        s.mount("https://", adapter)
+        s.mount("http://",  adapter)
+        _sessions[key] = s
+        return s
+
+def session_stats() -> dict:
+    """プール済み Session の接続再利用状況（新規接続数とリクエスト数。閉じたプールの分を含む）"""
+    with _disposed_lock:
+        stats = {"sessions": 0, "reused": 0, **_disposed}
+    with _sessions_guard:
+        sessions = list(_sessions.values())
+    for s in sessions:
+        stats["sessions"] += 1
+        adapters = {id(a): a for a in s.adapters.values()}.values()
+        for adapter in adapters:
+            pools = adapter.poolmanager.pools
+            for pool_key in list(pools.keys()):
+                pool = pools.get(pool_key)
+                if pool is None:
+                    continue
+                stats["requests"]    += pool.num_requests
+                stats["connections"] += pool.num_connections
+    stats["reused"] = max(0, stats["requests"] - stats["connections"])
+    return stats
+
+def close_sessions():
+    with _sessions_guard:
+        for s in _sessions.values():
+            s.close()
+        _sessions.clear()
+
+# ── 上限付きの読み込み ───────────────────────────────────
+# resp.content / resp.text は全体をメモリに載せてから返すので、
+# stream=True で取得したレスポンスをチャンク単位で読み、上限を超えた時点で打ち切る
+class ResponseRejected(Exception):
+    """サイズ超過・想定外の Content-Type などで読み込みを打ち切ったレスポンス"""
+
+_rejected: dict[str, str] = {}
+_rejected_lock = threading.Lock()
+
+def pop_rejection(url: str) -> str | None:
+    """fetch_text がその URL を読まずに捨てた理由（無ければ None）"""
+    with _rejected_lock:
+        return _rejected.pop(url, None)
+
+def iter_limited(resp: requests.Response, max_bytes: int):
+    """レスポンス本文をチャンクで yield する。max_bytes を超えたら ResponseRejected"""
+    length = resp.headers.get("Content-Length", "")
+    if length.isdigit() and int(length) > max_bytes:
+        raise ResponseRejected(f"too large: Content-Length {length} > {max_bytes} bytes")
+    total = 0
+    for chunk in resp.iter_content(READ_CHUNK):
+        total += len(chunk)
+        if total > max_bytes:
+            raise ResponseRejected(f"too large: more than {max_bytes} bytes")
+        yield chunk
+
+def read_limited(resp: requests.Response, max_bytes: int) -> bytes:
+    return b"".join(iter_limited(resp, max_bytes))
+
+_XML_ENCODING = re.compile(rb"^\s*<\?xml[^>]*encoding=[\"']([A-Za-z0-9._-]+)[\"']")
+_HTTP_CHARSET = re.compile(r"charset=[\"']?([A-Za-z0-9._-]+)", re.I)
+
+def _sniff_encoding(resp: requests.Response, head: bytes) -> str:
+    """BOM → Content-Type の charset → XML 宣言 → UTF-8 の順で文字コードを決める"""
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    m = _HTTP_CHARSET.search(resp.headers.get("Content-Type", ""))
+    candidate = m.group(1) if m else None
+    if not candidate:
+        m = _XML_ENCODING.match(head)
+        candidate = m.group(1).decode("ascii") if m else None
+    try:
+        return codecs.lookup(candidate).name if candidate else "utf-8"
+    except LookupError:
+        return "utf-8"
+
+def _read_text(resp: requests.Response, max_bytes: int) -> tuple[str, str, int]:
+    """
+    先頭チャンクで Content-Type / 文字コードを見極め、以降は逐次デコードしながら読む。
+    (テキスト, 本文の sha256, バイト数) を返す。
+    """
+    ctype = resp.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    if ctype.startswith(REJECT_TYPES):
+        raise ResponseRejected(f"unexpected content-type: {ctype}")
+    sha, parts, total, decoder = hashlib.sha256(), [], 0, None
+    for chunk in iter_limited(resp, max_bytes):
+        if decoder is None:
+            head = chunk[:1024]
+            if b"\x00" in head and not head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+                raise ResponseRejected(f"binary content (content-type: {ctype or 'none'})")
+            decoder = codecs.getincrementaldecoder(_sniff_encoding(resp, head))(errors="replace")
+        sha.update(chunk)
+        total += len(chunk)
+        parts.append(decoder.decode(chunk))
+    if decoder:
+        parts.append(decoder.decode(b"", final=True))
+    return "".join(parts), sha.hexdigest(), total
 
 # ── テキスト取得（HTTP→HTTPS フォールバック付き） ────
-def fetch_text(url: str, cfg: dict) -> str | None:
-    sess = _session(cfg)
+def fetch_text(url: str, cfg: dict, cache: ValidatorCache | None = None):
+    """
+    本文テキストを返す。失敗時は None、cache 指定時に前回から変化が無ければ NOT_MODIFIED。
+    cfg["max_bytes"] を超えるレスポンスは読まずに捨て、理由を pop_rejection(url) で返せるようにする。
+    """
+    sess = get_session(cfg)
     try:
-        resp = sess.get(url, timeout=cfg.get("timeout", DEFAULT_CFG["timeout"]))
-        resp.raise_for_status()
-        return resp.text
+        headers = cache.request_headers(url) if cache else {}
+        with metrics.timer("feed_http") as t:
+            resp = sess.get(url, headers=headers, stream=True,
+                            timeout=cfg.get("timeout", DEFAULT_CFG["timeout"]))
+            with resp:
+                resp.raise_for_status()
+                if resp.status_code == 304:
+                    text, digest = None, None
+                else:
+                    text, digest, t["bytes"] = _read_text(resp, cfg.get("max_bytes", DEFAULT_CFG["max_bytes"]))
+        if cache and cache.is_unchanged(url, resp, digest):
+            metrics.add("feed_unchanged")
+            return NOT_MODIFIED
+        return text
+    except ResponseRejected as e:
+        # 設定ミスのソースなので http フォールバックもせずエラーとして残す
+        metrics.add("feed_rejected")
+        with _rejected_lock:
+            _rejected[url] = str(e)
+        log.warning("fetch rejected", url=url, reason=str(e))
+        return None
     except Exception as e:
         if cfg.get("http_fallback") and url.startswith("https://"):
             new_url = url.replace("https://", "http://", 1)
             new_cfg = {**cfg, "http_fallback": False}
-            return fetch_text(new_url, new_cfg)
-        print("⚠️ fetch failed:", url, "->", e)
+            return fetch_text(new_url, new_cfg, cache)
+        log.warning("fetch failed", url=url, error=str(e))
         return None
 
 # ── パーサ関数群 ────────────────────────────────────────
@@ -60,25 +430,202 @@ def parse_json(text: str):
         if isinstance(data, dict) and "items" in data and isinstance(data["items"], list):
             return data["items"]
     except Exception as e:
-        print("⚠️ json parse failed:", e)
+        log.warning("json parse failed", error=str(e))
     return []
 
+# ── rss_fast：lxml iterparse によるストリーミングパーサ ─────
+# feedparser の代わりに <item> / <entry> を 1 件ずつ読み、crawl.py が使う項目
+# （id, link, title, published, updated, summary, summary_detail.type, content）だけの
+# 軽い dict を yield する。読み終えた要素はすぐ捨てるので、大きなフィードでもメモリが増えない。
+# 既読位置（HighWaterMarks）で打ち切られた場合は、それ以降のパースも行わない。
+_NS_ATOM    = "http://www.w3.org/2005/Atom"
+_NS_RSS1    = "http://purl.org/rss/1.0/"
+_NS_CONTENT = "http://purl.org/rss/1.0/modules/content/"
+_NS_DC      = "http://purl.org/dc/elements/1.1/"
+_NS_RDF     = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+_ITEM_TAGS  = ("item", f"{{{_NS_RSS1}}}item", f"{{{_NS_ATOM}}}entry")
+_XML_DECL   = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+class _Utf8Reader:
+    """
+    str を UTF-8 のバイト列として少しずつ iterparse に読ませるファイル風オブジェクト。
+    文書全体を encode したコピーを作らず、読み込み中に増えるのはチャンク 1 つ分だけにする。
+    """
+
+    def __init__(self, text: str, start: int = 0):
+        self._text = text
+        self._pos  = start
+
+    def read(self, size: int = -1) -> bytes:
+        # UTF-8 は 1 文字最大 4 バイトなので size // 4 文字なら size バイトを超えない
+        n = len(self._text) if size is None or size < 0 else max(1, size // 4)
+        chunk = self._text[self._pos:self._pos + n]
+        self._pos += len(chunk)
+        return chunk.encode("utf-8")
+
+def _text(elem, tag: str) -> str | None:
+    child = elem.find(tag)
+    if child is None:
+        return None
+    return "".join(child.itertext()).strip() or None
+
+def _rss_item(elem) -> dict:
+    ns = "" if elem.tag == "item" else f"{{{_NS_RSS1}}}"
+    about = elem.get(f"{{{_NS_RDF}}}about")
+    e = {
+        "title":     _text(elem, f"{ns}title"),
+        "link":      _text(elem, f"{ns}link") or about,
+        "id":        _text(elem, "guid") or about,
+        "published": _text(elem, "pubDate") or _text(elem, f"{{{_NS_DC}}}date"),
+    }
+    summary = _text(elem, f"{ns}description")
+    if summary:
+        e["summary"] = summary
+        e["summary_detail"] = {"type": "text/html"}
+    content = _text(elem, f"{{{_NS_CONTENT}}}encoded")
+    if content:
+        e["content"] = [{"type": "text/html", "value": content}]
+    return e
+
+def _atom_entry(elem) -> dict:
+    link = None
+    for l in elem.iterfind(f"{{{_NS_ATOM}}}link"):
+        if l.get("rel", "alternate") == "alternate":
+            link = l.get("href")
+            break
+    e = {
+        "title":     _text(elem, f"{{{_NS_ATOM}}}title"),
+        "link":      link,
+        "id":        _text(elem, f"{{{_NS_ATOM}}}id"),
+        "published": _text(elem, f"{{{_NS_ATOM}}}published"),
+        "updated":   _text(elem, f"{{{_NS_ATOM}}}updated"),
+    }
+    summary = elem.find(f"{{{_NS_ATOM}}}summary")
+    if summary is not None:
+        e["summary"] = "".join(summary.itertext()).strip()
+        e["summary_detail"] = {"type": "text/html" if summary.get("type") in ("html", "xhtml") else "text/plain"}
+    content = elem.find(f"{{{_NS_ATOM}}}content")
+    if content is not None and content.get("src") is None:
+        ctype = "text/html" if content.get("type") in ("html", "xhtml") else content.get("type", "text/plain")
+        e["content"] = [{"type": ctype, "value": "".join(content.itertext()).strip()}]
+    return e
+
+def parse_rss_fast(text: str):
+    """lxml iterparse で RSS 2.0 / RSS 1.0 / Atom のエントリを順に yield する（壊れたフィードは feedparser へ）"""
+    if etree is None:
+        yield from parse_rss(text)
+        return
+    # str で受け取るので XML 宣言（の encoding）は読み飛ばし、UTF-8 として少しずつ読ませる
+    decl = _XML_DECL.match(text)
+    data = _Utf8Reader(text, decl.end() if decl else 0)
+    done = 0
+    try:
+        for _, elem in etree.iterparse(data, events=("end",), tag=_ITEM_TAGS,
+                                       resolve_entities=False, no_network=True):
+            e = _atom_entry(elem) if elem.tag.startswith(f"{{{_NS_ATOM}}}") else _rss_item(elem)
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+            done += 1
+            yield {k: v for k, v in e.items() if v is not None}
+    except etree.XMLSyntaxError as ex:
+        # 未定義の実体参照・閉じ忘れなどは寛容な feedparser で読み直し、未出力の分だけ返す
+        metrics.add("feed_parse_fallback")
+        log.info("rss_fast fallback to feedparser", error=str(ex))
+        yield from parse_rss(text)[done:]
+        return
+    if done == 0:
+        # <item> / <entry> が無い（想定外の形式）なら feedparser に任せる
+        yield from parse_rss(text)
+
 PARSERS = {
-    "rss":  parse_rss,
-    "json": parse_json,
+    "rss":      parse_rss,
+    "rss_fast": parse_rss_fast,
+    "json":     parse_json,
 }
 
 # ── 外部 API：fetch → parse 一括ラッパ ─────────────────
-def fetch_and_parse(url: str, cfg: dict):
-    txt = fetch_text(url, cfg)
+def fetch_and_parse(url: str, cfg: dict, cache: ValidatorCache | None = None,
+                    marks: HighWaterMarks | None = None):
+    """
+    エントリのリストを返す。取得失敗・パーサ設定の誤りは None、前回から変化なしは空リスト。
+    marks を渡すと既読位置より前の（新しい）エントリだけを返す。
+    """
+    txt = fetch_text(url, cfg, cache)
     if txt is None:
+        return None
+    if txt is NOT_MODIFIED:
         return []
     parser_id = cfg.get("parser", DEFAULT_CFG["parser"])
     parser = PARSERS.get(parser_id)
     if not parser:
-        print("⚠️ unknown parser:", parser_id, "->", url)
-        return []
-    return parser(txt)
+        # 空リストだと「変化なし」としてバリデータが確定し、設定を直しても 304 で飛ばされてしまう
+        log.warning("unknown parser", parser=parser_id, url=url)
+        return None
+    mark = marks.get(url) if marks else None
+    # rss_fast はイテレータを返すので、計測とリスト化をこの中で済ませる
+    with metrics.timer("feed_parse"):
+        if marks:
+            return list(marks.take_new(url, parser(txt), mark))
+        return list(parser(txt))
+
+# ── 並列フェッチ：全体上限 + ホスト別上限 ────────────────
+_host_locks: dict[str, threading.BoundedSemaphore] = {}
+_host_locks_guard = threading.Lock()
+
+def _host_slot(url: str, limit: int) -> threading.BoundedSemaphore:
+    host = urlparse(url).netloc.lower()
+    with _host_locks_guard:
+        sem = _host_locks.get(host)
+        if sem is None:
+            sem = _host_locks[host] = threading.BoundedSemaphore(limit)
+        return sem
+
+def _fetch_limited(url: str, cfg: dict, per_host: int, cache: ValidatorCache | None,
+                   marks: HighWaterMarks | None, source: str | None):
+    with metrics.scope(source), _host_slot(url, per_host):
+        return fetch_and_parse(url, cfg, cache, marks)
+
+def fetch_many(jobs, max_workers: int = MAX_WORKERS, per_host: int = PER_HOST_MAX,
+               cache: ValidatorCache | None = None, label=None,
+               marks: HighWaterMarks | None = None):
+    """
+    jobs: [(key, url, cfg), ...] を並列に fetch_and_parse する。
+    完了した順に (key, url, entries) を yield するので、呼び出し側は
+    本文抽出・upsert をメインスレッドでそのまま続けられる。
+    cache を渡すと条件付き GET を行い、変化の無いフィードは空リストになる。
+    取得に失敗したフィードの entries は None。
+    marks を渡すと、各フィードの既読位置より新しいエントリだけを返す。
+    label(key) を渡すと、その戻り値をソース名として計測（metrics）に記録する。
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return
+    # 同一ホストのジョブが先頭に固まらないよう、ホスト単位でラウンドロビンに並べる
+    by_host: dict[str, list] = {}
+    for job in jobs:
+        by_host.setdefault(urlparse(job[1]).netloc.lower(), []).append(job)
+    ordered = []
+    while by_host:
+        for host in list(by_host):
+            ordered.append(by_host[host].pop(0))
+            if not by_host[host]:
+                del by_host[host]
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {
+            pool.submit(_fetch_limited, url, cfg, max(1, per_host), cache, marks,
+                        label(key) if label else None): (key, url)
+            for key, url, cfg in ordered
+        }
+        for fut in as_completed(futures):
+            key, url = futures[fut]
+            try:
+                entries = fut.result()
+            except Exception as e:
+                log.error("fetch worker failed", url=url, error=str(e))
+                entries = None
+            yield key, url, entries
 
 # ── ヘルパ：URL からファイル名向けスラッグ生成 ─────────
 def slug(url: str) -> str:
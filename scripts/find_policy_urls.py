@@ -4,11 +4,9 @@
 プライバシーポリシー、利用規約、著作権ポリシーなどを自動発見
 """
 import os
-import requests
+from politeness import polite_session
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
-import time
-import random
 from typing import Dict, List, Optional
 from supabase import create_client, Client
 
@@ -20,7 +18,7 @@ supabase: Client = create_client(
 
 class PolicyURLFinder:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = polite_session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
@@ -234,8 +232,7 @@ class PolicyURLFinder:
                     updated_count += 1
                     print(f"    ✅ DB更新完了")
                 
-            # レート制限（サイトに負荷をかけないよう）
-            time.sleep(random.uniform(2, 4))
+            # レート制限（サイトに負荷をかけないよう）は politeness.limiter がホスト単位で行う
         
         print("\n" + "=" * 60)
         print(f"🎯 完了: {found_count} 個のポリシーURL発見, {updated_count} 個DB更新")
@@ -4,7 +4,7 @@
 タイムアウト短縮・並列処理で効率化
 """
 import os
-import requests
+from politeness import polite_session
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 import time
@@ -20,7 +20,7 @@ supabase: Client = create_client(
 
 class FastPolicyFinder:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = polite_session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
@@ -153,9 +153,6 @@ class FastPolicyFinder:
                         # DB更新
                         if self.update_policy_url(source['id'], policy_url):
                             updated_count += 1
-                        
-                        # 少し間隔を開ける
-                        time.sleep(1)
                 
                 except Exception as e:
                     print(f"    ❌ エラー ({source['name']}): {e}")
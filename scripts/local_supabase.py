@@ -0,0 +1,118 @@
+# scripts/local_supabase.py
+"""
+ローカル用の Supabase 代替（インメモリ）
+crawl.py が使う範囲の supabase-py クエリ API（table / select / eq / in_ / insert / execute）
+だけを真似て、リプレイやベンチマークを本番 DB に触れずに回せるようにする。
+articles.url の一意制約も再現する。path を渡すと終了時に JSON で書き出せる。
+"""
+
+import json, uuid, pathlib, threading
+
+# 一意制約を再現するカラム
+UNIQUE_COLUMNS = {"articles": "url"}
+
+class LocalError(Exception):
+    pass
+
+class LocalResult:
+    def __init__(self, data):
+        self.data  = data
+        self.error = None
+
+class LocalQuery:
+    def __init__(self, db: "LocalSupabase", table: str):
+        self._db      = db
+        self._table   = table
+        self._op      = None
+        self._columns = "*"
+        self._filters = []
+        self._payload = None
+
+    def select(self, columns: str = "*"):
+        self._op, self._columns = "select", columns
+        return self
+
+    def insert(self, rows):
+        self._op, self._payload = "insert", rows
+        return self
+
+    def update(self, values: dict):
+        self._op, self._payload = "update", values
+        return self
+
+    def eq(self, column: str, value):
+        self._filters.append(lambda r: r.get(column) == value)
+        return self
+
+    def in_(self, column: str, values):
+        values = set(values)
+        self._filters.append(lambda r: r.get(column) in values)
+        return self
+
+    def _matches(self, row: dict) -> bool:
+        return all(f(row) for f in self._filters)
+
+    def _project(self, row: dict) -> dict:
+        if self._columns.strip() == "*":
+            return dict(row)
+        cols = [c.strip() for c in self._columns.split(",")]
+        return {c: row.get(c) for c in cols}
+
+    def execute(self) -> LocalResult:
+        return self._db._execute(self)
+
+class LocalSupabase:
+    def __init__(self, seed: dict | None = None, path: str | None = None):
+        self.tables: dict[str, list[dict]] = {k: [dict(r) for r in v] for k, v in (seed or {}).items()}
+        self.path   = pathlib.Path(path) if path else None
+        self.stats  = {"round_trips": 0, "rows_read": 0, "rows_written": 0}
+        self._lock  = threading.Lock()
+
+    def table(self, name: str) -> LocalQuery:
+        return LocalQuery(self, name)
+
+    def _execute(self, q: LocalQuery) -> LocalResult:
+        with self._lock:
+            self.stats["round_trips"] += 1
+            rows = self.tables.setdefault(q._table, [])
+
+            if q._op == "select":
+                data = [q._project(r) for r in rows if q._matches(r)]
+                self.stats["rows_read"] += len(data)
+                return LocalResult(data)
+
+            if q._op == "insert":
+                payload = q._payload if isinstance(q._payload, list) else [q._payload]
+                unique = UNIQUE_COLUMNS.get(q._table)
+                if unique:
+                    existing = {r.get(unique) for r in rows}
+                    seen = set()
+                    for r in payload:
+                        key = r.get(unique)
+                        if key in existing or key in seen:
+                            raise LocalError(f"duplicate key value violates unique constraint ({q._table}.{unique}={key})")
+                        seen.add(key)
+                inserted = [{"id": str(uuid.uuid4()), **r} for r in payload]
+                rows.extend(inserted)
+                self.stats["rows_written"] += len(inserted)
+                return LocalResult(inserted)
+
+            if q._op == "update":
+                updated = []
+                for r in rows:
+                    if q._matches(r):
+                        r.update(q._payload)
+                        updated.append(dict(r))
+                self.stats["rows_written"] += len(updated)
+                return LocalResult(updated)
+
+            raise LocalError(f"unsupported operation: {q._op}")
+
+    def save(self):
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(
+            json.dumps(self.tables, ensure_ascii=False, indent=1, default=str),
+            encoding="utf-8"
+        )
@@ -0,0 +1,87 @@
+# scripts/metrics.py
+"""
+クロール計測モジュール
+ステージ（HTTP 取得・パース・本文抽出・DB など）ごと、ソースごとに
+所要時間・回数・バイト数を集計し、task_logs.details に載せられる dict を返す。
+並列フェッチのワーカースレッドからも呼ばれるのでロックで保護し、
+「どのソースの処理か」はスレッドローカルのスコープで持つ。
+"""
+
+import json, time, pathlib, threading
+from contextlib import contextmanager
+
+class Metrics:
+    def __init__(self):
+        self._lock   = threading.Lock()
+        self._local  = threading.local()
+        self.stages  = {}   # stage -> {"count", "seconds", "max_seconds", "bytes"}
+        self.sources = {}   # source -> stage -> 同上
+
+    # ── スコープ（ソース名） ───────────────────────────
+    @contextmanager
+    def scope(self, source: str | None):
+        prev = getattr(self._local, "source", None)
+        self._local.source = source
+        try:
+            yield
+        finally:
+            self._local.source = prev
+
+    def current_source(self) -> str | None:
+        return getattr(self._local, "source", None)
+
+    # ── 記録 ──────────────────────────────────────────
+    @staticmethod
+    def _bump(bucket: dict, stage: str, count: int, seconds: float, nbytes: int):
+        st = bucket.setdefault(stage, {"count": 0, "seconds": 0.0, "max_seconds": 0.0, "bytes": 0})
+        st["count"]   += count
+        st["seconds"] += seconds
+        st["bytes"]   += nbytes
+        if seconds > st["max_seconds"]:
+            st["max_seconds"] = seconds
+
+    def add(self, stage: str, count: int = 1, seconds: float = 0.0, nbytes: int = 0,
+            source: str | None = None):
+        source = source or self.current_source()
+        with self._lock:
+            self._bump(self.stages, stage, count, seconds, nbytes)
+            if source:
+                self._bump(self.sources.setdefault(source, {}), stage, count, seconds, nbytes)
+
+    @contextmanager
+    def timer(self, stage: str, source: str | None = None):
+        """with metrics.timer("http") as t: ... t["bytes"] = n のようにバイト数も載せられる"""
+        extra = {"bytes": 0}
+        t0 = time.perf_counter()
+        try:
+            yield extra
+        finally:
+            self.add(stage, seconds=time.perf_counter() - t0, nbytes=extra["bytes"], source=source)
+
+    # ── 出力 ──────────────────────────────────────────
+    @staticmethod
+    def _round(bucket: dict) -> dict:
+        return {
+            stage: {**st, "seconds": round(st["seconds"], 3), "max_seconds": round(st["max_seconds"], 3)}
+            for stage, st in bucket.items()
+        }
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "stages": self._round(self.stages),
+                "sources": {src: self._round(b) for src, b in self.sources.items()},
+            }
+
+    def dump(self, path: str):
+        p = pathlib.Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(json.dumps(self.snapshot(), ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+            self.sources.clear()
+
+# プロセス内で共有する計測器
+metrics = Metrics()
@@ -0,0 +1,169 @@
+# scripts/politeness.py
+"""
+ホスト単位のレート制限（トークンバケット）
+fetcher / crawl / rss_validator / discover_* などの外部アクセスで共有し、
+スクリプトごとのバラバラな time.sleep() の代わりに
+「同じホストへは一定レート以下」だけを守る。別ホストへのアクセスは待たされない。
+429 / 503 の Retry-After を見て、そのホストへの以降のリクエストを自動で遅らせる。
+"""
+
+import os, time, threading, email.utils
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# ── 設定（環境変数で上書き可） ───────────────────────────
+HOST_RATE  = float(os.getenv("CRAWL_HOST_RATE", "2"))   # 1 ホストあたりの毎秒リクエスト数（0 以下で無制限）
+HOST_BURST = float(os.getenv("CRAWL_HOST_BURST", "4"))  # 連続で許すリクエスト数
+MAX_RETRY_AFTER = 600                                   # Retry-After の上限（秒）
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After（秒数 or HTTP-date）を秒に変換"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(float(value), MAX_RETRY_AFTER)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return min(max(0.0, when.timestamp() - time.time()), MAX_RETRY_AFTER)
+
+class _Bucket:
+    __slots__ = ("rate", "burst", "tokens", "updated", "blocked_until")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate          = rate
+        self.burst         = max(1.0, burst)
+        self.tokens        = self.burst
+        self.updated       = time.monotonic()
+        self.blocked_until = 0.0
+
+class HostRateLimiter:
+    def __init__(self, rate: float = HOST_RATE, burst: float = HOST_BURST):
+        self.rate      = rate
+        self.burst     = burst
+        self._buckets: dict[str, _Bucket] = {}
+        self._rates:   dict[str, tuple[float, float]] = {}
+        self._lock     = threading.Lock()
+        self.stats     = {"waits": 0, "wait_seconds": 0.0, "retry_after": 0}
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def set_rate(self, host: str, rate: float, burst: float | None = None):
+        """特定ホスト（API など）だけ別レートにする"""
+        with self._lock:
+            self._rates[host.lower()] = (rate, burst if burst is not None else self.burst)
+            self._buckets.pop(host.lower(), None)
+
+    def _bucket(self, host: str) -> _Bucket:
+        b = self._buckets.get(host)
+        if b is None:
+            rate, burst = self._rates.get(host, (self.rate, self.burst))
+            b = self._buckets[host] = _Bucket(rate, burst)
+        return b
+
+    def acquire(self, url: str):
+        """そのホストにリクエストしてよくなるまで待つ"""
+        host = self.host_of(url)
+        waited = 0.0
+        while True:
+            with self._lock:
+                b = self._bucket(host)
+                if b.rate <= 0 and b.blocked_until <= time.monotonic():
+                    break
+                now = time.monotonic()
+                if b.rate > 0:
+                    b.tokens  = min(b.burst, b.tokens + (now - b.updated) * b.rate)
+                    b.updated = now
+                wait = max(b.blocked_until - now,
+                           (1 - b.tokens) / b.rate if b.rate > 0 and b.tokens < 1 else 0.0)
+                if wait <= 0:
+                    if b.rate > 0:
+                        b.tokens -= 1
+                    break
+            time.sleep(wait)
+            waited += wait
+        if waited:
+            with self._lock:
+                self.stats["waits"] += 1
+                self.stats["wait_seconds"] += waited
+
+    def penalize(self, url: str, seconds: float):
+        """そのホストへのリクエストを seconds 秒止める"""
+        host = self.host_of(url)
+        with self._lock:
+            b = self._bucket(host)
+            b.blocked_until = max(b.blocked_until, time.monotonic() + seconds)
+            b.tokens = 0.0
+
+    def observe(self, url: str, resp):
+        """
+        429 / 503 のレスポンスなら Retry-After（無ければ 1 / rate 秒）だけ待たせる
+        resp は requests.Response でも urllib3 の HTTPResponse（PoliteRetry から）でもよい
+        """
+        status = getattr(resp, "status_code", None) or getattr(resp, "status", None)
+        if status not in (429, 503):
+            return
+        delay = parse_retry_after(resp.headers.get("Retry-After"))
+        if delay is None:
+            delay = 1 / self.rate if self.rate > 0 else 1.0
+        with self._lock:
+            self.stats["retry_after"] += 1
+        self.penalize(url, delay)
+
+# プロセス内で共有するリミッタ
+limiter = HostRateLimiter()
+
+class PoliteRetry(Retry):
+    """
+    urllib3 の自動リトライ（status_forcelist の 429 / 503 など）でも limiter.observe() を通す Retry。
+    リトライはアダプタの send() の内側で行われ、使い切ると RetryError になるので、
+    send() 後の observe() だけでは 429 / 503 がリミッタに伝わらない。
+    """
+
+    _DEFAULT_PORTS = {"http": 80, "https": 443}
+
+    def __init__(self, *args, rate_limiter: HostRateLimiter | None = None, **kwargs):
+        self.rate_limiter = rate_limiter or limiter
+        super().__init__(*args, **kwargs)
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.rate_limiter = self.rate_limiter
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if response is not None and _pool is not None:
+            netloc = _pool.host
+            if _pool.port and _pool.port != self._DEFAULT_PORTS.get(_pool.scheme):
+                netloc = f"{netloc}:{_pool.port}"
+            self.rate_limiter.observe(f"{_pool.scheme}://{netloc}{url or ''}", response)
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+class PoliteAdapter(HTTPAdapter):
+    """送信前に limiter.acquire()、受信後に limiter.observe() を挟む HTTPAdapter"""
+
+    def __init__(self, *args, rate_limiter: HostRateLimiter | None = None, **kwargs):
+        self.rate_limiter = rate_limiter or limiter
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        self.rate_limiter.acquire(request.url)
+        resp = super().send(request, **kwargs)
+        self.rate_limiter.observe(request.url, resp)
+        return resp
+
+def polite_session(user_agent: str | None = None, **adapter_kwargs) -> requests.Session:
+    """PoliteAdapter をマウントした requests.Session を作る（discover_* などの単発スクリプト用）"""
+    s = requests.Session()
+    if user_agent:
+        s.headers.update({"User-Agent": user_agent})
+    adapter = PoliteAdapter(**adapter_kwargs)
+    s.mount("https://", adapter)
+    s.mount("http://",  adapter)
+    return s
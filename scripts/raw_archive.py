@@ -0,0 +1,130 @@
+# scripts/raw_archive.py
+"""
+raw/ アーカイブの読み書きモジュール
+1 日分のフィード取得結果を raw/<date>/entries.jsonl.gz にまとめて追記する。
+フィード 1 本ごとに独立した gzip メンバーとして書き出し、
+raw/<date>/index.jsonl にソース・フィード単位のオフセットを記録するので、
+特定フィードだけをシークして読むことも、日全体をストリームで読むこともできる。
+旧形式（フィードごとの整形 JSON）も同じ iter_feeds() で読める。
+"""
+
+import os, sys, json, gzip, pathlib
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.log import get_logger
+
+log = get_logger("raw_archive")
+
+ARCHIVE_NAME = "entries.jsonl.gz"
+INDEX_NAME   = "index.jsonl"
+
+# 保存形式: archive（圧縮 JSON Lines）/ json（旧形式）
+RAW_FORMAT = os.getenv("RAW_FORMAT", "archive")
+
+# ── 書き込み ────────────────────────────────────────────
+class RawArchiveWriter:
+    """1 日分のアーカイブへフィード単位で追記する（単一スレッドから使う）"""
+
+    def __init__(self, day_dir: pathlib.Path):
+        self.day_dir    = pathlib.Path(day_dir)
+        self.archive    = self.day_dir / ARCHIVE_NAME
+        self.index_path = self.day_dir / INDEX_NAME
+
+    def append(self, source: dict, feed_url: str, slug: str, entries):
+        self.day_dir.mkdir(parents=True, exist_ok=True)
+        lines = "".join(
+            json.dumps(e, ensure_ascii=False, default=str) + "\n" for e in entries
+        )
+        member = gzip.compress(lines.encode("utf-8"))
+        with open(self.archive, "ab") as f:
+            offset = f.seek(0, os.SEEK_END)
+            f.write(member)
+        meta = {
+            "source":    source.get("name"),
+            "source_id": source.get("id"),
+            "category":  source.get("category"),
+            "feed_url":  feed_url,
+            "slug":      slug,
+            "offset":    offset,
+            "length":    len(member),
+            "count":     len(entries),
+        }
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(meta, ensure_ascii=False) + "\n")
+
+def write_legacy_json(day_dir: pathlib.Path, name: str, entries):
+    """旧形式：フィードごとの整形 JSON"""
+    day_dir = pathlib.Path(day_dir)
+    day_dir.mkdir(parents=True, exist_ok=True)
+    (day_dir / f"{name}.json").write_text(
+        json.dumps(entries, ensure_ascii=False, indent=2, default=str),
+        encoding="utf-8"
+    )
+
+# ── 読み込み ────────────────────────────────────────────
+def read_index(day_dir: pathlib.Path) -> list[dict]:
+    path = pathlib.Path(day_dir) / INDEX_NAME
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _read_member(f, meta: dict) -> list:
+    f.seek(meta["offset"])
+    data = gzip.decompress(f.read(meta["length"]))
+    return [json.loads(line) for line in data.decode("utf-8").splitlines() if line]
+
+def iter_feeds(day_dir: pathlib.Path, source: str | None = None, feed_url: str | None = None):
+    """
+    1 日分の raw データをフィード単位で (meta, entries) として順に返す。
+    メモリに載るのは常に 1 フィード分だけ。source / feed_url で絞り込み可能。
+    旧形式のファイルは meta の source / feed_url が不明（None）で、slug にファイル名が入る。
+    """
+    day_dir = pathlib.Path(day_dir)
+    archive = day_dir / ARCHIVE_NAME
+    if archive.exists():
+        with open(archive, "rb") as f:
+            for meta in read_index(day_dir):
+                if source and meta.get("source") != source:
+                    continue
+                if feed_url and meta.get("feed_url") != feed_url:
+                    continue
+                yield meta, _read_member(f, meta)
+
+    for path in sorted(day_dir.glob("*.json")):
+        if source and not path.stem.startswith(f"{source}-"):
+            continue
+        if feed_url:
+            continue  # 旧形式はフィード URL を持たない
+        try:
+            entries = json.loads(path.read_text(encoding="utf-8"))
+        except ValueError as e:
+            log.warning("raw json read failed", path=str(path), error=str(e))
+            continue
+        yield {"source": None, "source_id": None, "feed_url": None,
+               "slug": path.stem, "count": len(entries)}, entries
+
+def iter_entries(day_dir: pathlib.Path, **filters):
+    """エントリ単位で (meta, entry) を返すストリーム"""
+    for meta, entries in iter_feeds(day_dir, **filters):
+        for e in entries:
+            yield meta, e
+
+# ── 旧形式 → アーカイブ変換 ───────────────────────────────
+def compact_legacy(day_dir: pathlib.Path) -> int:
+    """
+    旧形式の *.json をアーカイブに追記して削除する。変換したファイル数を返す。
+    ファイル名からソース名は確定できないため、source は None のまま slug に元のファイル名を残す。
+    """
+    day_dir = pathlib.Path(day_dir)
+    writer = RawArchiveWriter(day_dir)
+    converted = 0
+    for path in sorted(day_dir.glob("*.json")):
+        try:
+            entries = json.loads(path.read_text(encoding="utf-8"))
+        except ValueError as e:
+            log.warning("raw json read failed", path=str(path), error=str(e))
+            continue
+        writer.append({}, None, path.stem, entries)
+        path.unlink()
+        converted += 1
+    return converted
@@ -4,14 +4,14 @@ RSS/Atomフィードの有効性を検証するユーティリティ
 新情報源発見時に自動的に呼び出される
 """
 import requests
+from politeness import polite_session
 import feedparser
 from urllib.parse import urlparse
-import time
 from typing import Dict, List, Optional
 
 class RSSValidator:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = polite_session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
@@ -161,8 +161,7 @@ class RSSValidator:
                         found_urls.append(test_url)
             except:
                 continue
-            
-            time.sleep(0.5)  # レート制限対策
+            # レート制限は polite_session（ホスト単位のトークンバケット）が行う
         
         return found_urls
 
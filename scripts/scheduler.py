@@ -0,0 +1,81 @@
+# scripts/scheduler.py
+"""
+フィード単位の適応的クロールスケジューラ
+フィードごとに「新着記事の流量（件/時, 指数移動平均）」を記録し、次回取得予定時刻を決める。
+新着が無いフィードは間隔を伸ばし（バックオフ）、新着の多いフィードは縮める。
+crawl.py は is_due() が True のフィードだけを取得する。
+状態は cache/feed_schedule.json に保存する（ValidatorCache と同じくワークフローでコミット）。
+"""
+
+import os, json, time, pathlib, datetime, threading
+
+# ── 設定（環境変数で上書き可） ───────────────────────────
+SCHEDULE_PATH   = os.getenv("FEED_SCHEDULE_PATH", "cache/feed_schedule.json")
+MIN_INTERVAL_H  = float(os.getenv("SCHEDULE_MIN_HOURS", "1"))     # 最短間隔
+MAX_INTERVAL_H  = float(os.getenv("SCHEDULE_MAX_HOURS", "168"))   # 最長間隔（7 日）
+SLACK_H         = float(os.getenv("SCHEDULE_SLACK_HOURS", "2"))   # cron の揺れ吸収（予定の少し前でも取得）
+TARGET_NEW      = 3.0    # 1 回の取得で拾いたい新着数の目安
+BACKOFF         = 1.5    # 新着ゼロ時の間隔の伸び率
+EMA_ALPHA       = 0.3    # 流量の指数移動平均の重み
+
+class FeedScheduler:
+    def __init__(self, path: str = SCHEDULE_PATH):
+        self.path  = pathlib.Path(path)
+        self._lock = threading.Lock()
+        self.stats = {"due": 0, "skipped": 0}
+        try:
+            self._data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            self._data = {}
+
+    def is_due(self, url: str, now: float | None = None) -> bool:
+        now = now or time.time()
+        with self._lock:
+            st = self._data.get(url)
+            due = st is None or st.get("next_due", 0) <= now + SLACK_H * 3600
+            self.stats["due" if due else "skipped"] += 1
+        return due
+
+    def record(self, url: str, new_items: int, now: float | None = None):
+        """取得結果（新着件数）から流量と次回予定を更新する"""
+        now = now or time.time()
+        with self._lock:
+            st = self._data.get(url) or {}
+            interval_h = st.get("interval_hours", 24.0)
+            last = st.get("last_fetch")
+            elapsed_h = max((now - last) / 3600, MIN_INTERVAL_H) if last else interval_h
+
+            rate = new_items / elapsed_h
+            ema = rate if "rate_per_hour" not in st else EMA_ALPHA * rate + (1 - EMA_ALPHA) * st["rate_per_hour"]
+
+            if new_items == 0:
+                interval_h = interval_h * BACKOFF
+            elif ema > 0:
+                interval_h = TARGET_NEW / ema
+            interval_h = min(max(interval_h, MIN_INTERVAL_H), MAX_INTERVAL_H)
+
+            next_due = now + interval_h * 3600
+            self._data[url] = {
+                "rate_per_hour":  round(ema, 4),
+                "interval_hours": round(interval_h, 2),
+                "last_fetch":     now,
+                "last_new_items": new_items,
+                "next_due":       next_due,
+                "next_due_at":    datetime.datetime.fromtimestamp(next_due).isoformat(timespec="minutes"),
+            }
+
+    def record_failure(self, url: str, now: float | None = None):
+        """取得失敗は流量に数えず、次回も取得対象のままにする"""
+        now = now or time.time()
+        with self._lock:
+            st = self._data.setdefault(url, {})
+            st["last_error"] = now
+            st["next_due"] = now
+
+    def save(self):
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(
+                json.dumps(self._data, ensure_ascii=False, indent=1, sort_keys=True),
+                encoding="utf-8"
+            )
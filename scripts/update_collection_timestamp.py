@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 """
 自動収集時にlast_collected_atを更新するサンプルスクリプト
+（実際の更新は crawl.py の touch_last_collected() が行い、
+  フィードごとの取得間隔は scheduler.py が新着の流量から決める）
 
 実際の定時収集スクリプト内で以下のような処理を追加する:
 1. 新しい記事が見つかった場合のみlast_collected_atを更新
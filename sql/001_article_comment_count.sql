@@ -0,0 +1,39 @@
+-- articles.comment_count: 削除されていないコメント数をトリガで維持する
+-- GET /api/articles はこの列を読むだけでコメント数を返し、
+-- has_comments フィルタも comment_count=gt.0 / eq.0 として DB 側で絞り込む。
+-- Supabase の SQL Editor で 1 回実行する（再実行しても安全）。
+
+alter table articles add column if not exists comment_count integer not null default 0;
+
+create or replace function articles_comment_count_sync() returns trigger
+language plpgsql as $$
+begin
+  if tg_op in ('INSERT', 'UPDATE') and not coalesce(new.is_deleted, false) then
+    update articles set comment_count = comment_count + 1 where id = new.article_id;
+  end if;
+  if tg_op in ('DELETE', 'UPDATE') and not coalesce(old.is_deleted, false) then
+    update articles set comment_count = greatest(comment_count - 1, 0) where id = old.article_id;
+  end if;
+  return null;
+end;
+$$;
+
+drop trigger if exists article_comments_count_sync on article_comments;
+create trigger article_comments_count_sync
+after insert or delete or update of is_deleted, article_id on article_comments
+for each row execute function articles_comment_count_sync();
+
+-- 既存コメントから初期値を埋める
+update articles a
+set comment_count = c.cnt
+from (
+  select article_id, count(*) as cnt
+  from article_comments
+  where not coalesce(is_deleted, false)
+  group by article_id
+) c
+where c.article_id = a.id and a.comment_count <> c.cnt;
+
+-- has_comments=with_comments の一覧（added_at 降順）用
+create index if not exists articles_with_comments_added_at_idx
+  on articles (added_at desc) where comment_count > 0;
@@ -0,0 +1,8 @@
+-- GET /api/articles のキーセットページネーション（after カーソル）用
+-- order=added_at.desc,id.desc と (added_at, id) < (カーソル) の絞り込みをインデックスだけで辿れるようにする。
+create index if not exists articles_added_at_id_idx
+  on articles (added_at desc, id desc);
+
+-- ソース別一覧（source_id=eq.X）も同じ順序で辿れるように
+create index if not exists articles_source_added_at_id_idx
+  on articles (source_id, added_at desc, id desc);
@@ -0,0 +1,4 @@
+-- articles.has_ai_summary: AI 要約の有無（生成列）
+-- 記事一覧（GET /api/articles?view=list）は ai_summary 本文を返さず、この列で要約済みアイコンを出す。
+alter table articles add column if not exists has_ai_summary boolean
+  generated always as (coalesce(btrim(ai_summary), '') <> '') stored;
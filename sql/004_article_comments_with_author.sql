@@ -0,0 +1,18 @@
+-- article_comments_with_author: コメントに投稿者の表示名を付けたビュー
+-- GET /api/article-comments はこのビューを 1 回読むだけで users.display_name まで返す
+-- （article_comments → users の埋め込みは外部キーが複数あり PostgREST が 300 を返すため、ビューで結合する）。
+-- users 列は従来のレスポンスと同じ {"display_name": ...} の形にする。
+
+create or replace view article_comments_with_author as
+select
+  c.*,
+  case when u.user_id is null then null
+       else json_build_object('display_name', u.display_name) end as users
+from article_comments c
+left join users u on u.user_id = c.user_id;
+
+-- 記事ごとの一覧（created_at 昇順）と since= による差分取得（updated_at）用
+create index if not exists article_comments_article_created_idx
+  on article_comments (article_id, created_at);
+create index if not exists article_comments_article_updated_idx
+  on article_comments (article_id, updated_at);
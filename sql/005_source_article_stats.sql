@@ -0,0 +1,45 @@
+-- sources.article_count / sources.last_article_at: 情報源ごとの記事数と最新記事の登録日時をトリガで維持する
+-- GET /api/sources?used_only=true（記事一覧のソース絞り込み）は article_count=gt.0 の sources を読むだけになり、
+-- articles 全行の source_id を取得しなくて済む。
+-- Supabase の SQL Editor で 1 回実行する（再実行しても安全）。
+
+alter table sources add column if not exists article_count integer not null default 0;
+alter table sources add column if not exists last_article_at timestamp;
+
+create or replace function sources_article_stats_sync() returns trigger
+language plpgsql as $$
+begin
+  if tg_op in ('INSERT', 'UPDATE') and new.source_id is not null then
+    update sources
+    set article_count = article_count + 1,
+        last_article_at = greatest(last_article_at, new.added_at)
+    where id = new.source_id;
+  end if;
+  if tg_op in ('DELETE', 'UPDATE') and old.source_id is not null then
+    -- 最新記事が消えた場合に備えて last_article_at は引き直す（(source_id, added_at desc) のインデックスで 1 行読むだけ）
+    update sources
+    set article_count = greatest(article_count - 1, 0),
+        last_article_at = (select max(added_at) from articles where source_id = old.source_id)
+    where id = old.source_id;
+  end if;
+  return null;
+end;
+$$;
+
+drop trigger if exists articles_source_stats_sync on articles;
+create trigger articles_source_stats_sync
+after insert or delete or update of source_id on articles
+for each row execute function sources_article_stats_sync();
+
+-- 既存記事から初期値を埋める
+update sources s
+set article_count = a.cnt,
+    last_article_at = a.last_added
+from (
+  select src.id, count(ar.id) as cnt, max(ar.added_at) as last_added
+  from sources src
+  left join articles ar on ar.source_id = src.id
+  group by src.id
+) a
+where a.id = s.id
+  and (s.article_count <> a.cnt or s.last_article_at is distinct from a.last_added);
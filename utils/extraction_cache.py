@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+記事本文の抽出結果キャッシュ
+正規化 URL と抽出器ごとに「生 HTML のハッシュ + 抽出テキスト + 抽出器バージョン」を
+SQLite に保存し、再ダウンロードと再抽出を省略する。
+同じ HTML を別 URL で取得した場合もハッシュから抽出結果を引ける（コンテンツアドレス）。
+
+使いどころ:
+  - クローラー（scripts/crawl.py）: 新規 URL しか抽出しないので、効くのは挿入に失敗して
+    次回再処理されるフィード・リプレイ・同じ HTML を返す別 URL。crawl.yml が actions/cache で
+    EXTRACT_CACHE_PATH のファイルを実行間で引き継ぐ。
+  - AI 要約 API（api/article-summary.py）: 抽出器が違うのでクローラーの結果は引けない
+    （クローラーの本文は articles.body から使う）。キャッシュは Vercel の /tmp にあり、ウォーム起動の間だけ有効。
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import tempfile
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from utils.log import get_logger
+
+log = get_logger("extraction_cache")
+
+# キャッシュファイルの場所（Vercel では /tmp のみ書き込み可能なので既定は一時ディレクトリ。
+# クローラーは crawl.yml で実行間に引き継ぐパスを指定する）
+DEFAULT_PATH = os.getenv(
+    "EXTRACT_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "cfrp_extract_cache.sqlite3")
+)
+DEFAULT_TTL = int(os.getenv("EXTRACT_CACHE_TTL", str(7 * 24 * 3600)))    # 秒
+DEFAULT_MAX_ENTRIES = int(os.getenv("EXTRACT_CACHE_MAX_ENTRIES", "5000"))
+
+# 正規化時に落とすトラッキング用クエリパラメータ
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
+
+def normalize_url(url: str) -> str:
+    """スキーム/ホストの小文字化、フラグメントとトラッキングパラメータの除去"""
+    parts = urlsplit(url.strip())
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    ]
+    path = parts.path or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path,
+                       urlencode(sorted(query)), ""))
+
+def hash_html(html: bytes | str) -> str:
+    if isinstance(html, str):
+        html = html.encode("utf-8", errors="replace")
+    return hashlib.sha256(html).hexdigest()
+
+
+class ExtractionCache:
+    """
+    抽出結果の LRU/TTL キャッシュ。
+    キャッシュはあくまで最適化なので、SQLite のエラーはログに出して無視する。
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, ttl: int = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path        = path
+        self.ttl         = ttl
+        self.max_entries = max_entries
+        self.stats       = {"hits": 0, "hash_hits": 0, "misses": 0, "puts": 0}
+        self._lock       = threading.Lock()
+        self._conn       = None
+
+    # ── 内部 ──────────────────────────────────────────
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS extractions (
+                    url_key     TEXT NOT NULL,
+                    extractor   TEXT NOT NULL,
+                    html_sha256 TEXT NOT NULL,
+                    text        TEXT NOT NULL,
+                    created_at  REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (url_key, extractor)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_extractions_hash "
+                         "ON extractions (html_sha256, extractor)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_extractions_accessed "
+                         "ON extractions (accessed_at)")
+            self._conn = conn
+        return self._conn
+
+    def _lookup(self, where: str, params: tuple) -> str | None:
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                f"SELECT rowid, text, created_at FROM extractions WHERE {where} LIMIT 1",
+                params
+            ).fetchone()
+            if row is None:
+                return None
+            rowid, text, created_at = row
+            if now - created_at > self.ttl:
+                db.execute("DELETE FROM extractions WHERE rowid = ?", (rowid,))
+                db.commit()
+                return None
+            db.execute("UPDATE extractions SET accessed_at = ? WHERE rowid = ?", (now, rowid))
+            db.commit()
+            return text
+
+    # ── 外部 API ──────────────────────────────────────
+    def get(self, url: str, extractor: str) -> str | None:
+        """URL から抽出済みテキストを引く（ダウンロード前に呼ぶ）"""
+        try:
+            text = self._lookup("url_key = ? AND extractor = ?",
+                                (normalize_url(url), extractor))
+        except sqlite3.Error as e:
+            log.warning("extraction cache read failed", error=str(e))
+            return None
+        self.stats["hits" if text is not None else "misses"] += 1
+        return text
+
+    def get_by_hash(self, html_sha256: str, extractor: str) -> str | None:
+        """同一 HTML の抽出結果を引く（ダウンロード後・抽出前に呼ぶ）"""
+        try:
+            text = self._lookup("html_sha256 = ? AND extractor = ?",
+                                (html_sha256, extractor))
+        except sqlite3.Error as e:
+            log.warning("extraction cache read failed", error=str(e))
+            return None
+        if text is not None:
+            self.stats["hash_hits"] += 1
+        return text
+
+    def put(self, url: str, html_sha256: str, text: str | None, extractor: str):
+        if not text:
+            return
+        now = time.time()
+        try:
+            with self._lock:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO extractions "
+                    "(url_key, extractor, html_sha256, text, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (normalize_url(url), extractor, html_sha256, text, now, now)
+                )
+                self.stats["puts"] += 1
+                # TTL 切れと、上限超過分（最終アクセスが古い順）を削除
+                db.execute("DELETE FROM extractions WHERE created_at < ?", (now - self.ttl,))
+                db.execute(
+                    "DELETE FROM extractions WHERE rowid IN ("
+                    " SELECT rowid FROM extractions ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+                db.commit()
+        except sqlite3.Error as e:
+            log.warning("extraction cache write failed", error=str(e))
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
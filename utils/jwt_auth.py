@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+JWT 認証（api/*.py 共通）
+api/auth.py が発行した HS256 トークンを検証する。検証済みトークンは SHA-256 をキーに
+有効期限（exp）まで LRU で保持するので、同じトークンでの 2 回目以降のリクエストは
+署名検証を省略する（ウォームなサーバーレス実行の間だけ有効なプロセス内キャッシュ）。
+"""
+
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import jwt
+
+JWT_SECRET      = os.environ.get('JWT_SECRET', 'default-secret-key')
+TOKEN_CACHE_MAX = int(os.getenv('JWT_CACHE_SIZE', '256'))  # 保持する検証済みトークン数
+
+_cache: "OrderedDict[str, tuple[dict, float]]" = OrderedDict()
+_lock = threading.Lock()
+
+def _cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+def verify_token(token: str) -> dict | None:
+    """トークンを検証してペイロードを返す。期限切れ・不正なら None"""
+    key = _cache_key(token)
+    now = time.time()
+    with _lock:
+        hit = _cache.get(key)
+        if hit is not None:
+            payload, expires = hit
+            if expires > now:
+                _cache.move_to_end(key)
+                return dict(payload)
+            del _cache[key]
+
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
+    except jwt.InvalidTokenError:
+        # ExpiredSignatureError も InvalidTokenError のサブクラス
+        return None
+
+    # exp の無いトークンはキャッシュしない（毎回検証する）
+    expires = payload.get('exp')
+    if TOKEN_CACHE_MAX > 0 and isinstance(expires, (int, float)):
+        with _lock:
+            _cache[key] = (dict(payload), float(expires))
+            _cache.move_to_end(key)
+            while len(_cache) > TOKEN_CACHE_MAX:
+                _cache.popitem(last=False)
+    return payload
+
+def verify_bearer(auth_header: str | None) -> dict | None:
+    """Authorization ヘッダー（Bearer <token>）を検証する"""
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return None
+    token = auth_header[len('Bearer '):].strip()
+    if not token:
+        return None
+    return verify_token(token)
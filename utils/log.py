@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+構造化ログ（api/ と scripts/ 共通）
+print() の代わりに get_logger() のロガーを使う。出力先は標準出力（Vercel / GitHub Actions のログ）。
+付加情報はキーワード引数で渡す: log.info("articles listed", count=20, source_id=...)
+
+環境変数:
+  LOG_LEVEL        DEBUG / INFO / WARNING / ERROR（既定 INFO。DEBUG は本番では出さない）
+  LOG_FORMAT       text / json（json は 1 行 1 レコードの JSON）
+  LOG_SAMPLE_RATE  DEBUG・INFO を出力する割合 0〜1（既定 1。WARNING 以上は常に出力）
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import datetime
+import functools
+from contextlib import contextmanager
+
+LOG_LEVEL       = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT      = os.getenv("LOG_FORMAT", "text").lower()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1"))
+
+ROOT_NAME = "cfrp"
+# logging 自体が解釈するキーワード（それ以外はフィールドとして出力）
+_LOGGING_KWARGS = ("exc_info", "stack_info", "stacklevel", "extra")
+
+class _SampleFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or LOG_SAMPLE_RATE >= 1:
+            return True
+        return random.random() < LOG_SAMPLE_RATE
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts":     datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc)
+                              .isoformat(timespec="milliseconds"),
+            "level":  record.levelname.lower(),
+            "logger": record.name.removeprefix(ROOT_NAME + "."),
+            "msg":    record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        line = f"{record.levelname} {record.name.removeprefix(ROOT_NAME + '.')}: {record.getMessage()}"
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+class StructLogger(logging.LoggerAdapter):
+    """log.info("msg", key=value) のキーワード引数を record.fields に載せる"""
+
+    def process(self, msg, kwargs):
+        fields = {k: kwargs.pop(k) for k in list(kwargs) if k not in _LOGGING_KWARGS}
+        if fields:
+            kwargs["extra"] = {**kwargs.get("extra", {}), "fields": fields}
+        return msg, kwargs
+
+def _configure() -> logging.Logger:
+    root = logging.getLogger(ROOT_NAME)
+    if not root.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+        handler.addFilter(_SampleFilter())
+        root.addHandler(handler)
+        root.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+        root.propagate = False
+    return root
+
+def get_logger(name: str) -> StructLogger:
+    """name は "api.articles" / "crawl" のようなコンポーネント名"""
+    _configure()
+    return StructLogger(logging.getLogger(f"{ROOT_NAME}.{name}"), {})
+
+@contextmanager
+def timed(log: StructLogger, event: str, level: int = logging.INFO, **fields):
+    """ブロックの所要時間を duration_ms として 1 行記録する（yield した dict にフィールドを足せる）"""
+    start = time.perf_counter()
+    try:
+        yield fields
+    except Exception:
+        fields["error"] = True
+        raise
+    finally:
+        fields["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        log.log(level, event, **fields)
+
+def log_requests(log: StructLogger):
+    """
+    BaseHTTPRequestHandler のクラスデコレータ。
+    do_GET / do_POST / do_PUT / do_PATCH / do_DELETE をリクエストごとに
+    method・path・duration_ms の 1 行で記録する（OPTIONS は記録しない）。
+    """
+    def decorate(cls):
+        for name in ("do_GET", "do_POST", "do_PUT", "do_PATCH", "do_DELETE"):
+            fn = cls.__dict__.get(name)
+            if fn is not None:
+                setattr(cls, name, _timed_method(fn, log, name[3:]))
+        return cls
+    return decorate
+
+def _timed_method(fn, log: StructLogger, method: str):
+    @functools.wraps(fn)
+    def wrapper(self):
+        with timed(log, "request", method=method, path=self.path.split("?", 1)[0]):
+            return fn(self)
+    return wrapper
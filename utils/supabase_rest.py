@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Supabase（PostgREST）共有クライアント
+api/*.py の各ハンドラから使う。プロセス内で 1 つの requests.Session（keep-alive の接続プール）を
+使い回すので、ウォームなサーバーレス実行では 2 回目以降の DB 呼び出しで TCP/TLS 接続を張り直さない。
+クエリは scripts/ で使っている supabase-py と同じ形（table().select().eq()...execute()）で組み立てる。
+"""
+
+import os
+import json
+import threading
+from urllib.parse import urlencode, quote
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "10"))    # 秒（接続・読み込みそれぞれ）
+POOL_MAXSIZE    = int(os.getenv("SUPABASE_POOL_MAXSIZE", "10"))  # 保持する keep-alive 接続数
+
+# クエリ文字列でエスケープしない文字（PostgREST の演算子構文: in.(a,b) / or=(...) / order=a.desc,b）
+_QUERY_SAFE = "(),.*:"
+
+class SupabaseError(Exception):
+    """PostgREST がエラー応答（4xx / 5xx）を返した"""
+
+    def __init__(self, status: int, reason: str, body: str):
+        super().__init__(f"{status} {reason}: {body[:200]}")
+        self.status = status
+        self.reason = reason
+        self.body   = body
+
+class Result:
+    """execute() の結果。data は JSON デコード済み、count は select(count=...) 指定時の総件数"""
+
+    def __init__(self, data, count: int | None, status: int):
+        self.data   = data
+        self.count  = count
+        self.status = status
+
+def _value(value) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+def _quoted(value) -> str:
+    """in.(...) / or=(...) の中で使う値（カンマや括弧を含んでもよいよう二重引用符で囲む）"""
+    text = _value(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+def _content_range_total(header: str | None) -> int | None:
+    """Content-Range（例: 0-19/1234, */0）から総件数を取り出す"""
+    if not header or "/" not in header:
+        return None
+    total = header.rsplit("/", 1)[1]
+    return int(total) if total.isdigit() else None
+
+class Query:
+    """1 テーブルへのリクエストを組み立てるビルダー"""
+
+    def __init__(self, client: "SupabaseClient", table: str):
+        self._client = client
+        self._table  = table
+        self._method = "GET"
+        self._params: list[tuple[str, str]] = []
+        self._order:  list[str] = []
+        self._prefer: list[str] = []
+        self._body = None
+
+    # ── 操作 ─────────────────────────────────────────
+    def select(self, columns: str = "*", count: str | None = None) -> "Query":
+        """count に exact / planned / estimated を渡すと Result.count に総件数が入る"""
+        self._params.append(("select", columns))
+        if count:
+            self._prefer.append(f"count={count}")
+        return self
+
+    def insert(self, rows, returning: bool = True) -> "Query":
+        self._method, self._body = "POST", rows
+        self._prefer.append("return=representation" if returning else "return=minimal")
+        return self
+
+    def update(self, values: dict, returning: bool = True) -> "Query":
+        self._method, self._body = "PATCH", values
+        self._prefer.append("return=representation" if returning else "return=minimal")
+        return self
+
+    def delete(self, returning: bool = False) -> "Query":
+        self._method = "DELETE"
+        self._prefer.append("return=representation" if returning else "return=minimal")
+        return self
+
+    # ── フィルタ ───────────────────────────────────────
+    def filter(self, column: str, operator: str, value) -> "Query":
+        self._params.append((column, f"{operator}.{_value(value)}"))
+        return self
+
+    def eq(self, column: str, value) -> "Query":
+        return self.filter(column, "eq", value)
+
+    def neq(self, column: str, value) -> "Query":
+        return self.filter(column, "neq", value)
+
+    def gt(self, column: str, value) -> "Query":
+        return self.filter(column, "gt", value)
+
+    def gte(self, column: str, value) -> "Query":
+        return self.filter(column, "gte", value)
+
+    def lt(self, column: str, value) -> "Query":
+        return self.filter(column, "lt", value)
+
+    def lte(self, column: str, value) -> "Query":
+        return self.filter(column, "lte", value)
+
+    def is_(self, column: str, value) -> "Query":
+        return self.filter(column, "is", value)
+
+    def in_(self, column: str, values) -> "Query":
+        self._params.append((column, "in.(" + ",".join(_quoted(v) for v in values) + ")"))
+        return self
+
+    def or_(self, expression: str) -> "Query":
+        """or_('status.eq.unread,flagged.is.true') のように PostgREST の論理式をそのまま渡す"""
+        self._params.append(("or", f"({expression})"))
+        return self
+
+    # ── 並び順・範囲 ───────────────────────────────────
+    def order(self, column: str, desc: bool = False) -> "Query":
+        self._order.append(f"{column}.{'desc' if desc else 'asc'}")
+        return self
+
+    def limit(self, count: int) -> "Query":
+        self._params.append(("limit", str(int(count))))
+        return self
+
+    def offset(self, count: int) -> "Query":
+        self._params.append(("offset", str(int(count))))
+        return self
+
+    # ── 実行 ─────────────────────────────────────────
+    def query_string(self) -> str:
+        params = list(self._params)
+        if self._order:
+            params.append(("order", ",".join(self._order)))
+        return urlencode(params, safe=_QUERY_SAFE, quote_via=quote)
+
+    def execute(self, timeout: float | None = None) -> Result:
+        return self._client.request(self._method, self._table, self.query_string(),
+                                    body=self._body, prefer=self._prefer, timeout=timeout)
+
+class SupabaseClient:
+    def __init__(self, url: str, key: str, timeout: float = DEFAULT_TIMEOUT):
+        self.rest_url = url.rstrip("/") + "/rest/v1"
+        self.timeout  = timeout
+        self.session  = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "apikey": key,
+            "Authorization": f"Bearer {key}",
+            "Content-Type": "application/json",
+        })
+
+    def table(self, name: str) -> Query:
+        return Query(self, name)
+
+    def rpc(self, function: str, params: dict | None = None, timeout: float | None = None) -> Result:
+        """PostgreSQL 関数（/rest/v1/rpc/<function>）を呼ぶ"""
+        return self.request("POST", f"rpc/{function}", body=params or {}, timeout=timeout)
+
+    def request(self, method: str, path: str, query: str = "", body=None,
+                prefer: list[str] | None = None, timeout: float | None = None) -> Result:
+        url = f"{self.rest_url}/{path}" + (f"?{query}" if query else "")
+        headers = {"Prefer": ",".join(prefer)} if prefer else None
+        resp = self.session.request(
+            method, url,
+            data=json.dumps(body).encode("utf-8") if body is not None else None,
+            headers=headers,
+            timeout=timeout or self.timeout,
+        )
+        if resp.status_code >= 400:
+            raise SupabaseError(resp.status_code, resp.reason, resp.text)
+        data = resp.json() if resp.content.strip() else None
+        return Result(data, _content_range_total(resp.headers.get("Content-Range")), resp.status_code)
+
+# ── プロセス内で共有するクライアント ───────────────────
+_client: SupabaseClient | None = None
+_client_lock = threading.Lock()
+
+def get_client() -> SupabaseClient:
+    """SUPABASE_URL / SUPABASE_KEY から作ったクライアントを返す（初回のみ生成）"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            url = os.environ.get("SUPABASE_URL")
+            key = os.environ.get("SUPABASE_KEY")
+            if not url or not key:
+                raise RuntimeError("SUPABASE_URL / SUPABASE_KEY が設定されていません")
+            _client = SupabaseClient(url, key)
+        return _client
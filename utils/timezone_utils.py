@@ -6,6 +6,9 @@
 
 import datetime
 import pytz
+from utils.log import get_logger
+
+log = get_logger("timezone_utils")
 
 # 日本時間タイムゾーン
 JST = pytz.timezone('Asia/Tokyo')
@@ -66,7 +69,7 @@ def parse_to_jst(date_string):
             return dt.astimezone(JST)
     
     except Exception as e:
-        print(f"Date parsing error: {e}")
+        log.debug("date parsing error", error=str(e))
         return None
 
 def format_jst_display(dt_string):
@@ -81,7 +84,7 @@ def format_jst_display(dt_string):
         return None
     
     except Exception as e:
-        print(f"Date formatting error: {e}")
+        log.debug("date formatting error", error=str(e))
         return None
 
 def safe_date_parse(txt):